@@ -1,28 +1,43 @@
 import streamlit as st
-from utils.api import get_game_status, get_league_details
-from utils.helpers import highlight_teams
+from utils.api import get_game_status, get_league_details, get_projected_scores, live_league_table
+from utils import metrics
+from utils.warmer import start_warmer
+from utils.helpers import highlight_teams, selected_league_id, team_colours
 import pandas as pd
 
-LEAGUE_ID = 12260   # hardcoded for now
+LEAGUE_ID = selected_league_id()  # ?league=<id>
+metrics.start_rerun("app")
+start_warmer(LEAGUE_ID)  # background refresh of the shared caches
 
 st.title("🏆 FPL Draft – League Snapshot")
 
 # --- Game status ---
-status = get_game_status()
+status = get_game_status() or {}
+gw = status.get("current_event", 1)
 st.subheader("Game Status")
-st.write(f"Current Gameweek: **{status['current_event']}**")
-st.write(f"Next Gameweek: **{status['next_event']}**")
-st.write(f"Processing Status: **{status['processing_status']}**")
+st.write(f"Current Gameweek: **{gw}**")
+st.write(f"Next Gameweek: **{status.get('next_event', '–')}**")
+st.write(f"Processing Status: **{status.get('processing_status', '–')}**")
 
 # --- League table ---
 league = get_league_details(LEAGUE_ID)
+if not league.get("league_entries"):
+    st.error(f"League {LEAGUE_ID} not found.")
+    st.stop()
+colours = team_colours(league["league_entries"])
 
 # map league_entry id -> league_entry object (for names)
 entry_map = {e["id"]: e for e in league["league_entries"] if e["entry_id"]}
 
-st.subheader("League Table")
+def movement(n: int) -> str:
+    return f"▲{n}" if n > 0 else f"▼{-n}" if n < 0 else "–"
+
+# official standings + projected results of this GW's unfinished matches
+st.subheader("League Table (live)")
 table = [
     {
+        "Rank": s["rank"],
+        "Move": movement(s["movement"]),
         "Team": entry_map[s["league_entry"]]["entry_name"],
         "Manager": (
             entry_map[s["league_entry"]]["player_first_name"] + " " +
@@ -31,19 +46,28 @@ table = [
         "Wins": s["matches_won"],
         "Losses": s["matches_lost"],
         "Draws": s["matches_drawn"],
+        "GW (live)": s["gw"],
+        "Points For": s["points_for"],
         "Points": s["total"],
     }
-    for s in league["standings"]
+    for s in live_league_table(LEAGUE_ID, gw)
     if s["league_entry"] in entry_map
 ]
 
 df_table = pd.DataFrame(table)
-st.dataframe(highlight_teams(df_table), use_container_width=True)
+if not df_table.empty:
+    df_table["GW (live)"] = df_table["GW (live)"].astype("Int64")  # None for entries without a match
+with metrics.timer("stage.app.styler"):
+    st.dataframe(highlight_teams(df_table, colours), use_container_width=True)
 
 # --- Current Matches as Table ---
 st.subheader("Current Gameweek Matches")
-gw = status["current_event"]
-matches = [m for m in league["matches"] if m["event"] == gw]
+matches = [m for m in league.get("matches") or [] if m.get("event") == gw]
+projections = get_projected_scores(LEAGUE_ID, gw)  # live, auto-subs applied
+
+def projected(league_entry: int):
+    p = projections.get(entry_map.get(league_entry, {}).get("entry_id"))
+    return p.points if p else None
 
 match_table = []
 for m in matches:
@@ -52,13 +76,17 @@ for m in matches:
     match_table.append({
         "Home": home,
         "Score A": m["league_entry_1_points"],
+        "Live A": projected(m["league_entry_1"]),
+        "Live B": projected(m["league_entry_2"]),
         "Score B": m["league_entry_2_points"],
         "Away": away
     })
 
 df_match = pd.DataFrame(match_table)
-st.dataframe(highlight_teams(df_match), use_container_width=True)
+with metrics.timer("stage.app.styler"):
+    st.dataframe(highlight_teams(df_match, colours), use_container_width=True)
 
 # Dev diagnostics (optional)
 with st.expander("Dev: diagnostics", expanded=False):
-    st.write(f"status: {status})")
\ No newline at end of file
+    st.write(f"status: {status})")
+    metrics.diagnostics()
\ No newline at end of file
@@ -0,0 +1,208 @@
+# benchmarks/loadtest.py
+"""
+Concurrent-viewer load test: one Streamlit instance, N simulated browsers.
+
+Starts the replay server (unless --draft-base/--fpl-base point at one), runs
+`streamlit run app.py` against it, and opens N websocket sessions that each
+walk through the pages the way a browser tab does (rerun_script per page,
+wait for script_finished). Reports per-page render latency percentiles,
+script exceptions and the upstream request counts the replay server saw.
+
+    python -m benchmarks.loadtest --sessions 20 --iterations 5 --latency 150 --error-rate 0.01
+    python -m benchmarks.loadtest --url http://127.0.0.1:8501   # an instance you started yourself
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from tornado.websocket import websocket_connect
+
+from benchmarks import payloads as pl
+from benchmarks.replay_server import serve
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    k = (len(values) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+# --- the app under test
+
+def start_app(port: int, draft: str, fpl: str, warmer: bool) -> subprocess.Popen:
+    env = {**os.environ, "FPL_DRAFT_BASE": draft, "FPL_FPL_BASE": fpl,
+           "FPL_WARMER": "1" if warmer else "0"}
+    env.setdefault("FPL_CACHE_DIR", tempfile.mkdtemp(prefix="fpl-loadtest-"))
+    return subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py", "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_healthy(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f"{url}/_stcore/health", timeout=2) as r:
+                if r.status == 200:
+                    return
+        except OSError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+        time.sleep(0.25)
+
+
+# --- simulated browser tab
+
+class Session:
+    """One websocket session; `run(page)` reruns a page and waits for it to finish."""
+
+    def __init__(self, url: str, timeout: float):
+        self.ws_url = url.replace("http", "ws", 1) + "/_stcore/stream"
+        self.timeout = timeout
+        self.pages: dict[str, str] = {}  # page name -> page_script_hash
+        self.ws = None
+
+    async def connect(self) -> None:
+        self.ws = await websocket_connect(self.ws_url, max_message_size=256 * 1024 * 1024)
+
+    async def run(self, page: str = "") -> bool:
+        """True if the page finished without an exception element."""
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_name = page
+        msg.rerun_script.page_script_hash = self.pages.get(page, "")
+        await self.ws.write_message(msg.SerializeToString(), binary=True)
+        ok = True
+        while True:
+            raw = await asyncio.wait_for(self.ws.read_message(), self.timeout)
+            if raw is None:
+                raise ConnectionError("websocket closed")
+            fm = ForwardMsg()
+            fm.ParseFromString(raw)
+            kind = fm.WhichOneof("type")
+            if kind == "navigation":
+                self.pages = {p.page_name: p.page_script_hash for p in fm.navigation.app_pages}
+            elif kind == "delta" and fm.delta.WhichOneof("type") == "new_element":
+                ok &= fm.delta.new_element.WhichOneof("type") != "exception"
+            elif kind == "script_finished":
+                return ok and fm.script_finished == ForwardMsg.FINISHED_SUCCESSFULLY
+
+    def close(self) -> None:
+        if self.ws is not None:
+            self.ws.close()
+
+
+async def drive(url: str, n_sessions: int, iterations: int, pages: list[str] | None,
+                timeout: float, ramp: float) -> tuple[dict, dict, float]:
+    latencies: dict[str, list[float]] = defaultdict(list)
+    failures: dict[str, int] = defaultdict(int)
+
+    async def tab(idx: int) -> None:
+        await asyncio.sleep(ramp * idx / max(n_sessions, 1))
+        s = Session(url, timeout)
+        try:
+            await s.connect()
+            await s.run()  # landing page; also tells us the page list
+            names = pages or list(s.pages)
+            for _ in range(iterations):
+                # start each tab on a different page so they don't move in lockstep
+                k = idx % len(names)
+                for page in names[k:] + names[:k]:
+                    t0 = time.perf_counter()
+                    try:
+                        ok = await s.run(page)
+                    except (asyncio.TimeoutError, ConnectionError):
+                        ok = False
+                    latencies[page].append(time.perf_counter() - t0)
+                    failures[page] += not ok
+        finally:
+            s.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(tab(i) for i in range(n_sessions)))
+    return latencies, failures, time.perf_counter() - t0
+
+
+def report(latencies: dict, failures: dict, wall: float, stats: dict | None) -> None:
+    print(f"{'page':12s} {'runs':>5s} {'fail':>5s} {'p50':>8s} {'p90':>8s} {'p99':>8s} {'max':>8s}")
+    for page, v in latencies.items():
+        print(f"{page:12s} {len(v):5d} {failures[page]:5d} {_percentile(v, .5):8.3f} {_percentile(v, .9):8.3f} "
+              f"{_percentile(v, .99):8.3f} {max(v):8.3f}")
+    runs = [x for v in latencies.values() for x in v]
+    if runs:
+        print(f"\n{len(runs)} page runs in {wall:.1f}s ({len(runs) / wall:.1f}/s), "
+              f"mean {statistics.fmean(runs):.3f}s")
+    if stats is not None:
+        print(f"\nupstream: {stats['requests']} requests ({stats['errors']} injected errors), "
+              f"{stats['bytes'] / 1e6:.1f} MB")
+        for path, n in sorted(stats["by_path"].items(), key=lambda kv: -kv[1])[:15]:
+            print(f"  {n:6d}  {path}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Drive N concurrent sessions against one Streamlit instance.")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=3, help="passes over the pages per session")
+    parser.add_argument("--pages", nargs="*", default=None, help="page names (default: all)")
+    parser.add_argument("--ramp", type=float, default=2.0, help="seconds over which sessions connect")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per page run (s)")
+    parser.add_argument("--latency", type=float, default=100.0, help="replay latency (ms)")
+    parser.add_argument("--jitter", type=float, default=30.0, help="replay latency std-dev (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of replay requests answered 503")
+    parser.add_argument("--entries", type=int, default=None, help="scale the payload set to this many entries")
+    parser.add_argument("--elements", type=int, default=None, help="scale the payload set to this many elements")
+    parser.add_argument("--draft-base", default=None, help="use an already running replay server")
+    parser.add_argument("--fpl-base", default=None)
+    parser.add_argument("--url", default=None, help="use an already running app instead of starting one")
+    parser.add_argument("--port", type=int, default=8599)
+    parser.add_argument("--warmer", action="store_true", help="run the app with the background warmer")
+    args = parser.parse_args()
+
+    server = app = None
+    if args.draft_base and args.fpl_base:
+        draft, fpl = args.draft_base, args.fpl_base
+    else:
+        data = pl.load()
+        if not data or args.entries or args.elements:
+            data = pl.dataset(args.entries or 7, args.elements or 700)
+        server = serve(data, latency_ms=args.latency, jitter_ms=args.jitter, error_rate=args.error_rate)
+        draft, fpl = server.base_urls
+
+    url = args.url
+    if url is None:
+        app = start_app(args.port, draft, fpl, args.warmer)
+        url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_healthy(url)
+        latencies, failures, wall = asyncio.run(
+            drive(url, args.sessions, args.iterations, args.pages, args.timeout, args.ramp))
+    finally:
+        if app is not None:
+            app.terminate()
+            app.wait(10)
+
+    print(f"\n{args.sessions} sessions x {args.iterations} passes against {url}\n")
+    report(latencies, failures, wall, server.stats() if server else None)
+    if server is not None:
+        server.shutdown()
+    return 1 if any(failures.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+# benchmarks/payloads.py
+"""
+Recorded API payloads for offline benchmarks (and the replay server).
+
+A payload set is a dict of API path -> JSON body, e.g. "/bootstrap-static",
+"/league/12260/details", "/entry/177491/event/5", "/event/5/live",
+"/fixtures". Recorded sets live on disk under PAYLOAD_DIR/<host>/<path>.json
+(host is "draft" or "fpl"); `scale()` grows a set to any number of
+entries/elements, and `synthesize()` builds one from scratch when nothing
+has been recorded yet.
+"""
+import copy
+import json
+import os
+import random
+import re
+from datetime import datetime, timedelta, timezone
+
+PAYLOAD_DIR = os.environ.get("FPL_PAYLOAD_DIR", os.path.join(os.path.dirname(__file__), "payloads"))
+
+HOSTS = {"draft": "draft.premierleague.com", "fpl": "fantasy.premierleague.com"}
+
+
+# --- on-disk layout
+
+def path_to_file(host: str, path: str, root: str = PAYLOAD_DIR) -> str:
+    return os.path.join(root, host, path.strip("/") + ".json")
+
+
+def save(payloads: dict, root: str = PAYLOAD_DIR) -> None:
+    for key, body in payloads.items():
+        host, path = key.split(":", 1)
+        fn = path_to_file(host, path, root)
+        os.makedirs(os.path.dirname(fn), exist_ok=True)
+        with open(fn, "w", encoding="utf-8") as fh:
+            json.dump(body, fh)
+
+
+def load(root: str = PAYLOAD_DIR) -> dict:
+    """{"draft:/bootstrap-static": {...}, "fpl:/fixtures": [...], ...}; {} if nothing recorded."""
+    out = {}
+    for host in HOSTS:
+        base = os.path.join(root, host)
+        for dirpath, _, files in os.walk(base):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                rel = os.path.relpath(os.path.join(dirpath, name), base)[: -len(".json")]
+                with open(os.path.join(dirpath, name), encoding="utf-8") as fh:
+                    out[f"{host}:/{rel.replace(os.sep, '/')}"] = json.load(fh)
+    return out
+
+
+def route(payloads: dict, url: str):
+    """Body for a draft/fantasy API URL, or None if the set doesn't have it."""
+    m = re.match(r"^https?://([^/]+)(?::\d+)?(?:/(draft|fpl))?/api(/[^?]*)(?:\?(.*))?$", url)
+    if not m:
+        return None
+    netloc, prefix, path, query = m.groups()
+    host = prefix or ("fpl" if netloc.startswith("fantasy") else "draft")
+    body = payloads.get(f"{host}:{path}")
+    if body is not None and path == "/fixtures" and query:
+        ev = re.search(r"event=(\d+)", query)
+        if ev:
+            body = [f for f in body if f.get("event") == int(ev.group(1))]
+    return body
+
+
+# --- helpers over a payload set
+
+def league_id(payloads: dict) -> int:
+    for key in payloads:
+        m = re.match(r"draft:/league/(\d+)/details$", key)
+        if m:
+            return int(m.group(1))
+    raise KeyError("payload set has no league details")
+
+
+def current_event(payloads: dict) -> int:
+    return int(payloads["draft:/game"]["current_event"])
+
+
+# --- scaling
+
+def scale(base: dict, n_entries: int, n_elements: int, seed: int = 0) -> dict:
+    """
+    Copy of `base` with `n_elements` players (cloned stats/teams, new ids) and
+    `n_entries` league entries (15 picks each, cycling through the element pool).
+    """
+    rnd = random.Random(seed)
+    out = copy.deepcopy(base)
+    lid, gw = league_id(base), current_event(base)
+
+    boot = out["draft:/bootstrap-static"]
+    src_elements = boot["elements"]
+    n_src = len(src_elements)
+    elements = []
+    for i in range(n_elements):
+        el = dict(src_elements[i % n_src])
+        el["id"] = i + 1
+        elements.append(el)
+    boot["elements"] = elements
+    src_ids = [e["id"] for e in src_elements]
+
+    live_key = f"draft:/event/{gw}/live"
+    src_live = base[live_key]["elements"]
+    if isinstance(src_live, list):
+        src_live = {str(v["id"]): v for v in src_live}
+    out[live_key]["elements"] = {
+        str(i + 1): src_live.get(str(src_ids[i % n_src]), {"stats": {}, "explain": []})
+        for i in range(n_elements)
+    }
+
+    details = out[f"draft:/league/{lid}/details"]
+    src_entries = details["league_entries"]
+    entries = []
+    for i in range(n_entries):
+        e = dict(src_entries[i % len(src_entries)])
+        e["id"] = 10_000 + i
+        e["entry_id"] = 100_000 + i
+        if i >= len(src_entries):
+            e["entry_name"] = f"{e['entry_name']} #{i}"
+        entries.append(e)
+    details["league_entries"] = entries
+
+    ids = [e["entry_id"] for e in entries]
+    league_ids = [e["id"] for e in entries]
+    matches, standings = [], []
+    for ev in range(1, 39):
+        order = league_ids[:]
+        rnd.shuffle(order)
+        for a, b in zip(order[::2], order[1::2]):
+            matches.append({
+                "event": ev, "league_entry_1": a, "league_entry_2": b,
+                "league_entry_1_points": rnd.randint(20, 70) if ev < gw else 0,
+                "league_entry_2_points": rnd.randint(20, 70) if ev < gw else 0,
+                "started": ev <= gw, "finished": ev < gw,
+            })
+    for rank, le in enumerate(league_ids, start=1):
+        standings.append({"league_entry": le, "rank": rank, "last_rank": rank, "matches_won": 0,
+                          "matches_drawn": 0, "matches_lost": 0, "points_for": 0, "total": 0})
+    details["matches"], details["standings"] = matches, standings
+
+    # picks: 2 GKP, 5 DEF, 5 MID, 3 FWD per entry, cycling through the pool
+    by_type: dict[int, list[int]] = {}
+    for el in elements:
+        by_type.setdefault(el["element_type"], []).append(el["id"])
+    for k in list(out):
+        if re.match(r"draft:/entry/\d+/event/\d+$", k):
+            del out[k]
+    cursor = {t: 0 for t in by_type}
+
+    def take(t: int, n: int) -> list[int]:
+        pool = by_type.get(t) or [1]
+        got = [pool[(cursor[t] + j) % len(pool)] for j in range(n)]
+        cursor[t] += n
+        return got
+
+    owner = {}
+    for eid in ids:
+        gk, de, mi, fw = take(1, 2), take(2, 5), take(3, 5), take(4, 3)
+        squad = [gk[0]] + de[:4] + mi[:4] + fw[:2] + [gk[1], de[4], mi[4], fw[2]]
+        out[f"draft:/entry/{eid}/event/{gw}"] = {
+            "picks": [{"element": pid, "position": i + 1, "multiplier": 1 if i < 11 else 0}
+                      for i, pid in enumerate(squad)],
+            "subs": [],
+        }
+        for pid in squad:
+            owner.setdefault(pid, eid)
+
+    out[f"draft:/league/{lid}/element-status"] = {"element_status": [
+        {"element": el["id"], "owner": owner.get(el["id"]), "status": "o" if el["id"] in owner else "a"}
+        for el in elements
+    ]}
+    out[f"draft:/draft/league/{lid}/choices"] = {"choices": [
+        {"element": pid, "choice": i + 1} for i, pid in enumerate(owner)
+    ]}
+    return out
+
+
+def synthesize(n_entries: int = 7, n_elements: int = 700, gw: int = 5,
+               league: int = 12260, seed: int = 0) -> dict:
+    """A plausible mid-GW payload set built from scratch (used when nothing is recorded)."""
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    iso = lambda d: d.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    teams = [{"id": t, "name": f"Team {t}", "short_name": f"T{t:02d}"} for t in range(1, 21)]
+    types = [{"id": i, "singular_name_short": s} for i, s in enumerate(("GKP", "DEF", "MID", "FWD"), 1)]
+    elements = [{"id": i, "web_name": f"Player {i}", "team": (i % 20) + 1,
+                 "element_type": (1, 2, 2, 3, 3, 4)[i % 6]} for i in range(1, 701)]
+    events = {"current": gw, "next": gw + 1,
+              "data": [{"id": e, "finished": e < gw, "data_checked": e < gw} for e in range(1, 39)]}
+
+    fixtures, fid = [], 1
+    for ev in range(1, 39):
+        for k in range(10):
+            ko = now + timedelta(days=7 * (ev - gw), hours=k - 5)
+            done = ko < now - timedelta(hours=2)
+            fixtures.append({"id": fid, "event": ev, "team_h": 2 * k + 1, "team_a": 2 * k + 2,
+                             "kickoff_time": iso(ko), "started": ko < now, "finished": done,
+                             "finished_provisional": done, "stats": []})
+            fid += 1
+    team_fixture = {f[side]: f for f in fixtures if f["event"] == gw for side in ("team_h", "team_a")}
+
+    live = {}
+    for el in elements:
+        f = team_fixture[el["team"]]
+        m = rnd.choice((0, 25, 90)) if f["started"] else 0
+        stats = {k: 0 for k in ("goals_scored", "assists", "clean_sheets", "goals_conceded", "yellow_cards",
+                                "red_cards", "saves", "bonus", "bps", "defensive_contribution",
+                                "penalties_saved", "penalties_missed", "own_goals", "total_points")}
+        stats["minutes"] = m
+        if m:
+            stats.update(goals_scored=int(rnd.random() < 0.1), assists=int(rnd.random() < 0.1),
+                         clean_sheets=int(m >= 60 and rnd.random() < 0.3), goals_conceded=rnd.randint(0, 3),
+                         saves=rnd.randint(0, 5) if el["element_type"] == 1 else 0, bps=rnd.randint(-3, 45),
+                         defensive_contribution=rnd.randint(0, 14), total_points=rnd.randint(1, 12))
+        live[str(el["id"])] = {"stats": stats, "explain": [[[], f["id"]]] if f["started"] else []}
+
+    base = {
+        "draft:/game": {"current_event": gw, "next_event": gw + 1, "processing_status": "n",
+                        "waivers_processed": False},
+        "draft:/bootstrap-static": {"elements": elements, "teams": teams, "element_types": types,
+                                    "events": events},
+        f"draft:/event/{gw}/live": {"elements": live},
+        f"draft:/league/{league}/details": {
+            "league": {"id": league, "name": "Synthetic league"},
+            "league_entries": [{"id": 100 + i, "entry_id": 1000 + i, "entry_name": f"Team {i + 1}",
+                                "player_first_name": "Manager", "player_last_name": str(i + 1)}
+                               for i in range(7)],
+            "matches": [], "standings": [],
+        },
+        "fpl:/fixtures": fixtures,
+    }
+    return scale(base, n_entries, n_elements, seed)
+
+
+def dataset(n_entries: int, n_elements: int) -> dict:
+    """Recorded payloads scaled to size, or a synthetic set if none are recorded."""
+    base = load()
+    return scale(base, n_entries, n_elements) if base else synthesize(n_entries, n_elements)
+
+
+# --- in-process replay (swap the shared HTTP session)
+
+class _Response:
+    def __init__(self, body):
+        self._body = body
+        self.status_code = 200 if body is not None else 404
+        self.content = json.dumps(body).encode() if body is not None else b""
+        self.headers = {}
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"replay: HTTP {self.status_code}")
+
+
+class ReplaySession:
+    """Stands in for requests.Session: answers GETs from a payload set and counts them."""
+
+    def __init__(self, payloads: dict):
+        self.payloads = payloads
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return _Response(route(self.payloads, url))
+
+
+def install(payloads: dict) -> ReplaySession:
+    """Route every utils.client fetch to `payloads`; starts from an empty response cache."""
+    import streamlit as st
+    from utils import client, disk_cache, swr
+
+    session = ReplaySession(payloads)
+    client.get_session = lambda: session
+    disk_cache.clear()
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    swr.clear_all()
+    return session
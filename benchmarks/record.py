@@ -0,0 +1,54 @@
+# benchmarks/record.py
+"""
+Record the API payloads the app uses into benchmarks/payloads/ for offline
+benchmarking and the replay server.
+
+    python -m benchmarks.record --league 12260 [--event 5]
+"""
+import argparse
+
+import requests
+
+from benchmarks.payloads import PAYLOAD_DIR, save
+from utils.api import DRAFT_BASE, FPL_BASE
+
+
+def _get(url: str):
+    r = requests.get(url, timeout=30)
+    r.raise_for_status()
+    return r.json()
+
+
+def record(league_id: int, event: int | None = None) -> dict:
+    game = _get(f"{DRAFT_BASE}/game")
+    gw = event or game["current_event"]
+    details = _get(f"{DRAFT_BASE}/league/{league_id}/details")
+
+    payloads = {
+        "draft:/game": {**game, "current_event": gw},
+        "draft:/bootstrap-static": _get(f"{DRAFT_BASE}/bootstrap-static"),
+        f"draft:/league/{league_id}/details": details,
+        f"draft:/league/{league_id}/element-status": _get(f"{DRAFT_BASE}/league/{league_id}/element-status"),
+        f"draft:/draft/league/{league_id}/choices": _get(f"{DRAFT_BASE}/draft/league/{league_id}/choices"),
+        f"draft:/event/{gw}/live": _get(f"{DRAFT_BASE}/event/{gw}/live"),
+        "fpl:/fixtures": _get(f"{FPL_BASE}/fixtures"),
+    }
+    for e in details.get("league_entries") or []:
+        if e.get("entry_id"):
+            payloads[f"draft:/entry/{e['entry_id']}/event/{gw}"] = _get(
+                f"{DRAFT_BASE}/entry/{e['entry_id']}/event/{gw}")
+    return payloads
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record FPL API payloads for offline benchmarks.")
+    parser.add_argument("--league", type=int, required=True)
+    parser.add_argument("--event", type=int, default=None, help="GW to record (default: current)")
+    args = parser.parse_args()
+    payloads = record(args.league, args.event)
+    save(payloads)
+    print(f"recorded {len(payloads)} payloads into {PAYLOAD_DIR}")
+
+
+if __name__ == "__main__":
+    main()
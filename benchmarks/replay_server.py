@@ -0,0 +1,133 @@
+# benchmarks/replay_server.py
+"""
+Local stand-in for draft.premierleague.com / fantasy.premierleague.com.
+
+Replays recorded payloads (benchmarks/payloads/, or a synthetic/scaled set)
+with configurable latency and error rate. Point the app at it with:
+
+    python -m benchmarks.replay_server --port 8765 --latency 150 --error-rate 0.02
+    FPL_DRAFT_BASE=http://127.0.0.1:8765/draft/api \\
+    FPL_FPL_BASE=http://127.0.0.1:8765/fpl/api streamlit run app.py
+
+GET /__stats returns request counts per path; GET /__reset zeroes them.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from benchmarks import payloads as pl
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, data: dict, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, seed: int | None = None):
+        super().__init__(address, _Handler)
+        self.data = data
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rnd = random.Random(seed)
+        self.counts: Counter = Counter()
+        self.errors = 0
+        self.bytes_out = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_urls(self) -> tuple[str, str]:
+        host, port = self.server_address[:2]
+        root = f"http://{host}:{port}"
+        return f"{root}/draft/api", f"{root}/fpl/api"
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"requests": sum(self.counts.values()), "errors": self.errors,
+                    "bytes": self.bytes_out, "by_path": dict(self.counts)}
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counts.clear()
+            self.errors = 0
+            self.bytes_out = 0
+
+    def start(self) -> "ReplayServer":
+        threading.Thread(target=self.serve_forever, name="replay-server", daemon=True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: ReplayServer
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        srv = self.server
+        path = urlsplit(self.path).path
+        if path == "/__stats":
+            return self._send(200, json.dumps(srv.stats()).encode())
+        if path == "/__reset":
+            srv.reset()
+            return self._send(200, b"{}")
+
+        with srv.lock:
+            srv.counts[path] += 1
+            delay = max(0.0, srv.rnd.gauss(srv.latency_ms, srv.jitter_ms)) / 1000
+            fail = srv.rnd.random() < srv.error_rate
+        time.sleep(delay)
+
+        if fail:
+            with srv.lock:
+                srv.errors += 1
+            return self._send(503, b'{"detail": "replay: injected error"}')
+
+        body = pl.route(srv.data, f"http://replay{self.path}")
+        if body is None:
+            return self._send(404, b'{"detail": "Not found."}')
+        raw = json.dumps(body).encode()
+        with srv.lock:
+            srv.bytes_out += len(raw)
+        self._send(200, raw)
+
+
+def serve(data: dict | None = None, host: str = "127.0.0.1", port: int = 0, **options) -> ReplayServer:
+    """Start a replay server on a background thread (port 0 = any free port)."""
+    return ReplayServer((host, port), data if data is not None else pl.dataset(7, 700), **options).start()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded FPL API payloads.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="mean response latency (ms)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latency std-dev (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 503")
+    parser.add_argument("--entries", type=int, default=None, help="scale the set to this many entries")
+    parser.add_argument("--elements", type=int, default=None, help="scale the set to this many elements")
+    args = parser.parse_args()
+
+    data = pl.load()
+    if not data or args.entries or args.elements:
+        data = pl.dataset(args.entries or 7, args.elements or 700)
+    srv = ReplayServer((args.host, args.port), data, args.latency, args.jitter, args.error_rate)
+    draft, fpl = srv.base_urls
+    print(f"replaying on FPL_DRAFT_BASE={draft} FPL_FPL_BASE={fpl}")
+    srv.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
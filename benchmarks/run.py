@@ -0,0 +1,173 @@
+# benchmarks/run.py
+"""
+Offline benchmarks over recorded (or synthetic) API payloads.
+
+Times the data-building functions at 7/20/100 entries x 700/5,000 elements,
+saves the results under benchmarks/results/<commit>.json and compares them
+with the previous run so regressions show up between commits.
+
+    python -m benchmarks.run                 # everything
+    python -m benchmarks.run --quick         # 7 entries / 700 elements only
+    python -m benchmarks.run --pages         # also time full page runs (AppTest)
+    python -m benchmarks.run -k bonus        # only cases whose name contains "bonus"
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+from benchmarks import payloads as pl
+
+# pl.install() clears the response cache: point it at a scratch dir before
+# utils.disk_cache is imported, never at the app's real .cache
+os.environ["FPL_CACHE_DIR"] = tempfile.mkdtemp(prefix="fpl-bench-")
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+SIZES = [(7, 700), (20, 700), (100, 700), (7, 5000), (20, 5000), (100, 5000)]
+PAGES = ["app.py", "pages/live.py", "pages/players.py", "pages/teams.py", "pages/preview.py"]
+
+
+def _cases(data: dict, with_pages: bool) -> dict:
+    # imported here so the replay session is installed before anything fetches
+    import numpy as np
+    from utils import api
+    from utils.bonus import _fixture_bonus, provisional_bonus
+    from utils.helpers import compute_score, compute_scores, format_contribs
+    from utils.live import LiveStats, diff_live_stats
+
+    lid, gw = pl.league_id(data), pl.current_event(data)
+    live_payload = data[f"draft:/event/{gw}/live"]
+    boot = data["draft:/bootstrap-static"]
+    pos_of = {et["id"]: et["singular_name_short"] for et in boot["element_types"]}
+    ids = [el["id"] for el in boot["elements"]]
+    pos = [pos_of.get(el["element_type"], "") for el in boot["elements"]]
+    fixtures = [f for f in data["fpl:/fixtures"] if f.get("event") == gw]
+
+    live = LiveStats.from_payload(live_payload)
+    rows = [live.row(pid) for pid in ids]
+    stats_df = live.frame(ids)
+    team_players = api.get_team_players()
+    moved = LiveStats(live.ids, {k: v + (np.arange(len(v)) % 50 == 0) for k, v in live.columns.items()})
+
+    # warm the fetch layer so the builders below time CPU work, not replay I/O
+    api.build_gw_player_table(lid, gw)
+    api.build_owned_index(lid, gw)
+
+    def owned_index_cold():
+        api._owned_index.cache_clear()
+        return api.build_owned_index(lid, gw)
+
+    def bonus_cold():
+        _fixture_bonus.cache_clear()
+        return provisional_bonus(fixtures, live, team_players)
+
+    cases = {
+        "live.LiveStats.from_payload": lambda: LiveStats.from_payload(live_payload),
+        "live.diff_live_stats": lambda: diff_live_stats(live, moved),
+        "helpers.compute_score[loop]": lambda: [compute_score(r, p) for r, p in zip(rows, pos) if p],
+        "helpers.compute_scores": lambda: compute_scores(stats_df, pos),
+        "helpers.format_contribs[loop]": lambda: [format_contribs(r) for r in rows],
+        "bonus.provisional_bonus[cold]": bonus_cold,
+        "bonus.provisional_bonus[memo]": lambda: provisional_bonus(fixtures, live, team_players),
+        "api.build_owned_index[cold]": owned_index_cold,
+        "api.build_owned_index": lambda: api.build_owned_index(lid, gw),
+        "api.build_gw_player_table": lambda: api.build_gw_player_table.__wrapped__(lid, gw),
+    }
+    if with_pages:
+        from streamlit.testing.v1 import AppTest
+        for page in PAGES:
+            cases[f"page:{page}"] = (lambda p=page: AppTest.from_file(p, default_timeout=120).run())
+    return cases
+
+
+def _time(fn, repeat: int) -> dict:
+    fn()  # warm-up
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    per_call = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"min": min(per_call), "median": statistics.median(per_call), "number": number}
+
+
+def _commit() -> str:
+    try:
+        sha = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD", "--", "utils", "pages", "app.py"]).returncode
+        return sha + ("-dirty" if dirty else "")
+    except Exception:
+        return "unknown"
+
+
+def _previous(exclude: str) -> dict | None:
+    files = sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")), key=os.path.getmtime, reverse=True)
+    for fn in files:
+        if os.path.basename(fn) != f"{exclude}.json":
+            with open(fn, encoding="utf-8") as fh:
+                return json.load(fh)
+    return None
+
+
+def _fmt(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.0f} ns"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks over recorded API payloads.")
+    parser.add_argument("--quick", action="store_true", help="smallest size only")
+    parser.add_argument("--pages", action="store_true", help="also time full page runs")
+    parser.add_argument("-k", dest="filter", default="", help="only cases containing this text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.20, help="slowdown flagged as regression")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    os.environ.setdefault("FPL_WARMER", "0")
+    commit = _commit()
+    results = {}
+    for n_entries, n_elements in (SIZES[:1] if args.quick else SIZES):
+        data = pl.dataset(n_entries, n_elements)
+        session = pl.install(data)
+        cases = _cases(data, args.pages)
+        for name, fn in cases.items():
+            if args.filter not in name:
+                continue
+            key = f"{name}@e{n_entries}_p{n_elements}"
+            results[key] = _time(fn, args.repeat)
+            print(f"{key:60s} {_fmt(results[key]['min'])}", flush=True)
+        results[f"upstream_requests@e{n_entries}_p{n_elements}"] = {"count": session.calls}
+
+    prev = _previous(commit)
+    regressions = []
+    if prev:
+        print(f"\ncompared with {prev['commit']}:")
+        for key, r in results.items():
+            old = prev["results"].get(key)
+            if not old or "min" not in r or "min" not in old:
+                continue
+            change = r["min"] / old["min"] - 1
+            flag = "  REGRESSION" if change > args.threshold else ""
+            if flag:
+                regressions.append(key)
+            print(f"{key:60s} {change:+7.1%}{flag}")
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        with open(os.path.join(RESULTS_DIR, f"{commit}.json"), "w", encoding="utf-8") as fh:
+            json.dump({"commit": commit, "timestamp": time.time(), "python": platform.python_version(),
+                       "results": results}, fh, indent=1)
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
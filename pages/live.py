@@ -1,7 +1,8 @@
 # pages/live.py
 import streamlit as st
-from utils.helpers import highlight_teams, TEAM_COLOURS
+from utils.helpers import highlight_teams, selected_league_id, team_colours, STAT_LABELS
 from datetime import datetime, timezone
+import os
 import pandas as pd
 
 try:
@@ -9,16 +10,13 @@ try:
 except Exception:
     ZoneInfo = None
 
-# Optional autorefresh (pip install streamlit-autorefresh)
-try:
-    from streamlit_autorefresh import st_autorefresh
-except Exception:
-    st_autorefresh = None
-
 from utils.api import (
-    get_game_status, get_bootstrap, get_fixtures,
-    get_league_details, get_entry_event, get_event_live,
+    get_game_status, get_bootstrap_store, get_fixtures,
+    get_league_details, get_entry_event, get_live_stats, get_live_tracker,
+    get_provisional_bonus, get_projected_scores, live_points, event_live_ttl,
 )
+from utils import metrics
+from utils.warmer import start_warmer
 
 st.set_page_config(layout="wide")
 
@@ -43,28 +41,38 @@ def format_kickoff(iso_utc: str) -> str:
     except Exception:
         return iso_utc
 
-# ---- Load core data
-LEAGUE_ID = 12260
+# ---- Load core data (full reruns only; the live panel below refreshes on its own)
+LEAGUE_ID = selected_league_id()
+metrics.start_rerun("live")
+start_warmer(LEAGUE_ID)  # background refresh of the shared caches
 status    = get_game_status() or {}
 gw        = status.get("current_event", 1)
-bootstrap = get_bootstrap() or {}
-fixtures  = sorted(get_fixtures(gw) or [], key=lambda x: x.get("kickoff_time") or "")
+bootstrap = get_bootstrap_store()                                          # shared, read-only
 league    = get_league_details(LEAGUE_ID) or {}
-live      = get_event_live(gw) or {}
 # Build CURRENT ownership (element_id -> owner team name) from each entry's GW picks
 # Build ownership (element -> entry_id) and entry_id -> name map
-from utils.api import build_current_ownership_ids, league_entries_map
+from utils.api import build_current_ownership_ids, build_owned_index, league_entries_map
 
 ownership_ids = build_current_ownership_ids(LEAGUE_ID, gw, starters_only=False)
 entries_map = league_entries_map(LEAGUE_ID)                                # entry_id -> entry obj
+colours = team_colours(entries_map.values())
+
+# Live panel refresh: FPL_LIVE_REFRESH seconds (0 = off), else the adaptive
+# live TTL (20s in play ... hours between GWs), so ticks follow the data.
+LIVE_REFRESH = os.environ.get("FPL_LIVE_REFRESH")
+def refresh_every() -> int | None:
+    if LIVE_REFRESH is not None:
+        return int(LIVE_REFRESH) or None
+    return event_live_ttl(gw)
+REFRESH_EVERY = refresh_every()
 
 # Team + player lookups
 teams = {
     t["id"]: {"name": t["name"], "abbr": t["short_name"]}
-    for t in (bootstrap.get("teams") or [])
+    for t in bootstrap.teams.values()
 }
 
-players_by_id = {int(p["id"]): p for p in (bootstrap.get("elements") or [])}
+players_by_id = bootstrap.elements
 
 def _team_name(team_id: int) -> str:
     t = teams.get(team_id, {})
@@ -74,30 +82,34 @@ def _team_abbr(team_id: int) -> str:
     t = teams.get(team_id, {})
     return t.get("abbr", "") if isinstance(t, dict) else ""
 
-LEAGUE_ID = 12260
-gw = status.get("current_event", 1)
 
 # element -> entry_name
 ownership = {pid: entries_map.get(eid, {}).get("entry_name", "—")
              for pid, eid in ownership_ids.items()}
 
-# ---- Live stats map from /event/{gw}/live
-# Endpoint shape can be dict { "82": {...} } or list [{id, stats, ...}]
-live_elements = live.get("elements", {})
-live_stats_map = {}
-
-if isinstance(live_elements, dict):
-    for k, v in live_elements.items():
-        try:
-            pid = int(k)
-        except Exception:
-            continue
-        live_stats_map[pid] = v.get("stats", {}) or {}
-elif isinstance(live_elements, list):
-    for v in live_elements:
-        pid = v.get("id")
-        if pid is not None:
-            live_stats_map[pid] = v.get("stats", {}) or {}
+# ---- Row cache: only players whose live stats changed since this viewer's
+# last render get their row rebuilt (None = unknown version, rebuild all)
+row_cache_key = f"live_rows_{LEAGUE_ID}_gw{gw}"
+row_cache = st.session_state.setdefault(row_cache_key, {})
+
+def live_row(live, prov_bonus, p: dict) -> dict:
+    pid = int(p["id"])
+    owner = ownership.get(pid, "—")
+    points = live_points(live, prov_bonus, pid)  # provisional bonus can move without this player's stats changing
+    cached = row_cache.get(pid)
+    if cached is not None and cached["Owned by"] == owner and cached["Points"] == points:
+        return cached
+    name = p.get("web_name", f"Player {pid}")
+    team_abbr = teams.get(p["team"], {}).get("abbr", "")
+    row = {
+        "Player [Team]": f"{name} [{team_abbr}]",
+        "Owned by": owner,
+        "Minutes": live.get(pid, "minutes"),
+        "Points": points,
+        "Contrib": live.contribs(pid),
+    }
+    row_cache[pid] = row
+    return row
 
 # ---- CSS (hide checkboxes, tidy table, no-wrap player/team, line-broken contrib)
 st.markdown(
@@ -122,122 +134,144 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Short labels for stats
-STAT_LABELS = {
-    "minutes": "min",
-    "goals_scored": "g",
-    "assists": "a",
-    "clean_sheets": "cs",
-    "goals_conceded": "gc",
-    "yellow_cards": "yc",
-    "red_cards": "rc",
-    "saves": "saves",
-    "bonus": "b",
-    "bps": "bps",
-    "defensive_contribution": "def",
-    "penalties_saved": "ps",
-    "penalties_missed": "pm",
-    "own_goals": "og",
-}
-
-# Useful display order (minutes first)
-STAT_ORDER = [
-    "minutes", "goals_scored", "assists", "clean_sheets", "goals_conceded",
-    "yellow_cards", "red_cards", "saves", "bonus", "bps",
-    "defensive_contribution", "penalties_saved", "penalties_missed", "own_goals",
-]
-
 # ---- Header
 st.title(f"Fixtures for Gameweek {gw}")
-st.caption(f"Last refresh: {now_str()}")
-
-if not fixtures:
-    st.info("No fixtures found.")
-else:
-    # Create tab labels like "Arsenal vs Chelsea"
-    tab_labels = [fixture_label(f) for f in fixtures]
-    tabs = st.tabs(tab_labels)
-
-    for f, tab in zip(fixtures, tabs):
-        home_name = _team_name(f.get("team_h"))
-        away_name = _team_name(f.get("team_a"))
-        kickoff   = format_kickoff(f.get("kickoff_time"))
-
-        with tab:
-            st.subheader(f"{home_name} vs {away_name}\n{kickoff}")
-
-            # Players involved in this fixture (by team)
-            fixture_team_ids = {f.get("team_h"), f.get("team_a")}
-            fixture_players = [p for p in players_by_id.values() if p.get("team") in fixture_team_ids]
-
-            # Only those owned right now
-            owned_players = [p for p in fixture_players if p["id"] in ownership]
-
-            if not owned_players:
-                st.write("No owned players in this fixture.")
-                continue
-
-            # Build rows with stats
-            rows = []
-            for p in owned_players:
-                pid = int(p["id"])
-                name = p.get("web_name", f"Player {pid}")
-                team_abbr = teams.get(p["team"], {}).get("abbr", "")
-                owner_eid = ownership_ids.get(pid)
-                owner = entries_map.get(owner_eid, {}).get("entry_name", "—")
-
-                stats   = live_stats_map.get(pid, {})
-                minutes = stats.get("minutes", 0)
-                points  = stats.get("total_points", 0)
-
-                contribs = []
-                if "minutes" in stats: contribs.append(f"min+{stats['minutes']}")
-                if stats.get("goals_scored"): contribs.append(f"g+{stats['goals_scored']}")
-                if stats.get("assists"): contribs.append(f"a+{stats['assists']}")
-                if stats.get("clean_sheets"): contribs.append(f"cs+{stats['clean_sheets']}")
-                if stats.get("goals_conceded"): contribs.append(f"gc+{stats['goals_conceded']}")
-                if stats.get("yellow_cards"): contribs.append(f"yc+{stats['yellow_cards']}")
-                if stats.get("red_cards"): contribs.append(f"rc+{stats['red_cards']}")
-                if stats.get("saves"): contribs.append(f"saves+{stats['saves']}")
-                if stats.get("bonus"): contribs.append(f"b+{stats['bonus']}")
-                if "bps" in stats: contribs.append(f"bps+{stats['bps']}")
-                if "defensive_contribution" in stats: contribs.append(f"def+{stats['defensive_contribution']}")
-
-                rows.append({
-                    "Player [Team]": f"{name} [{team_abbr}]",
-                    "Owned by": owner,
-                    "Minutes": minutes,
-                    "Points": points,
-                    "Contrib": " ".join(contribs) if contribs else "—",
-                })
-
-            # Render table
-            html = ['<table class="fixture-table">']
-            html.append("<thead><tr><th>Player [Team]</th><th>Owned by</th><th>Minutes</th><th>Points</th><th>Contrib</th></tr></thead><tbody>")
-            for r in rows:
-                owner = r['Owned by']
-                colour = TEAM_COLOURS.get(owner, "")
-                style = f" style='background-color:{colour};'" if colour else ""
-                html.append(
-                    f"<tr>"
-                    f"<td class='player-team'>{r['Player [Team]']}</td>"
-                    f"<td{style}>{owner}</td>"
-                    f"<td>{r['Minutes']}</td>"
-                    f"<td>{r['Points']}</td>"
-                    f"<td class='contrib'>{r['Contrib']}</td>"
-                    f"</tr>"
+
+def fixture_table_html(rows: list[dict]) -> str:
+    html = ['<table class="fixture-table">']
+    html.append("<thead><tr><th>Player [Team]</th><th>Owned by</th><th>Minutes</th><th>Points</th><th>Contrib</th></tr></thead><tbody>")
+    for r in rows:
+        owner = r['Owned by']
+        colour = colours.get(owner, "")
+        style = f" style='background-color:{colour};'" if colour else ""
+        html.append(
+            f"<tr>"
+            f"<td class='player-team'>{r['Player [Team]']}</td>"
+            f"<td{style}>{owner}</td>"
+            f"<td>{r['Minutes']}</td>"
+            f"<td>{r['Points']}</td>"
+            f"<td class='contrib'>{r['Contrib']}</td>"
+            f"</tr>"
+        )
+    html.append("</tbody></table>")
+    return "\n".join(html)
+
+# fixture_id -> (data version, html): revisiting an unchanged fixture is free
+html_cache = st.session_state.setdefault(f"live_html_{LEAGUE_ID}_gw{gw}", {})
+
+def render_fixture(f: dict, live, prov_bonus, owned_index: dict) -> None:
+    home_name = _team_name(f.get("team_h"))
+    away_name = _team_name(f.get("team_a"))
+    kickoff   = format_kickoff(f.get("kickoff_time"))
+    st.subheader(f"{home_name} vs {away_name}\n{kickoff}")
+
+    # Owned players in this fixture (precomputed fixture -> players index)
+    owned_ids = [pid for pid in owned_index["fixture"].get(f.get("id"), []) if pid in players_by_id]
+    if not owned_ids:
+        st.write("No owned players in this fixture.")
+        return
+
+    version = (live.version, tuple((pid, ownership.get(pid), prov_bonus.get(pid)) for pid in owned_ids))
+    cached = html_cache.get(f.get("id"))
+    if cached is not None and cached[0] == version:
+        html = cached[1]
+    else:
+        # Build rows with stats (cached per player, see live_row)
+        with metrics.timer("stage.live.rows"):
+            rows = [live_row(live, prov_bonus, players_by_id[pid]) for pid in owned_ids]
+        with metrics.timer("stage.live.html"):
+            html = fixture_table_html(rows)
+        html_cache[f.get("id")] = (version, html)
+    st.markdown(html, unsafe_allow_html=True)
+
+def render_scores(projections: dict) -> None:
+    """This GW's H2H matches with live projected scores (auto-subs applied)."""
+    by_league_entry = {e["id"]: e for e in (league.get("league_entries") or []) if e.get("entry_id")}
+    def side(le_id):
+        e = by_league_entry.get(le_id, {})
+        p = projections.get(e.get("entry_id"))
+        return e.get("entry_name", "TBD"), (p.points if p else None)
+    table = []
+    for m in (league.get("matches") or []):
+        if m.get("event") != gw:
+            continue
+        (home, a), (away, b) = side(m.get("league_entry_1")), side(m.get("league_entry_2"))
+        table.append({"Home": home, "Live A": a, "Live B": b, "Away": away})
+    if table:
+        st.dataframe(highlight_teams(pd.DataFrame(table), colours), hide_index=True, use_container_width=True)
+
+# ---- Live panel: everything that depends on live stats. Re-runs on its own
+# every REFRESH_EVERY seconds (and on fixture clicks) without re-running the
+# page, so lookups, CSS and diagnostics above/below aren't rebuilt per tick.
+@st.fragment(run_every=REFRESH_EVERY)
+def live_panel() -> None:
+    with metrics.timer("stage.live.tick"):
+        if LIVE_REFRESH is None and event_live_ttl(gw) != REFRESH_EVERY:
+            st.rerun(scope="app")  # fixture phase moved (e.g. kickoff): pick up the new interval
+
+        fixtures    = sorted(get_fixtures(gw) or [], key=lambda x: x.get("kickoff_time") or "")
+        live        = get_live_stats(gw)
+        tracker     = get_live_tracker(gw)
+        tracker.update(live)
+        prov_bonus  = get_provisional_bonus(gw)                            # element -> bonus incl. provisional
+        owned_index = build_owned_index(LEAGUE_ID, gw)                     # fixture_id -> owned element ids
+
+        changed_ids = tracker.changed_since(st.session_state.get(f"{row_cache_key}_version"))
+        if changed_ids is None:
+            row_cache.clear()
+        else:
+            for pid in changed_ids:
+                row_cache.pop(pid, None)
+        st.session_state[f"{row_cache_key}_version"] = live.version
+        st.session_state[f"{row_cache_key}_rebuilt"] = "all" if changed_ids is None else len(changed_ids)
+
+        st.caption(f"Last refresh: {now_str()}")
+        render_scores(get_projected_scores(LEAGUE_ID, gw))
+
+        if not fixtures:
+            st.info("No fixtures found.")
+        else:
+            # Only the selected fixture is built and rendered; default to the first unfinished one
+            default_idx = next((i for i, f in enumerate(fixtures) if not f.get("finished")), 0)
+            selected = st.radio(
+                "Fixture",
+                options=range(len(fixtures)),
+                index=default_idx,
+                format_func=lambda i: fixture_label(fixtures[i]),
+                horizontal=True,
+                label_visibility="collapsed",
+                key=f"live_fixture_gw{gw}",
+            )
+            render_fixture(fixtures[selected], live, prov_bonus, owned_index)
+
+        # ---- What just changed (from the shared live tracker)
+        with st.expander("What just changed", expanded=False):
+            if not tracker.feed:
+                st.caption("No changes seen since this GW's live data was first loaded.")
+            for item in list(tracker.feed)[:20]:
+                pid = item["element"]
+                p = players_by_id.get(pid, {})
+                label = STAT_LABELS.get(item["stat"], item["stat"])
+                when = datetime.fromtimestamp(item["time"], LOCAL_TZ).strftime("%H:%M:%S")
+                st.write(
+                    f"{when} · {p.get('web_name', f'Player {pid}')} [{_team_abbr(p.get('team'))}] "
+                    f"{label}{item['delta']:+d} · {ownership.get(pid, '—')}"
                 )
-            html.append("</tbody></table>")
-            st.markdown("\n".join(html), unsafe_allow_html=True)
+
+live_panel()
+fixtures = sorted(get_fixtures(gw) or [], key=lambda x: x.get("kickoff_time") or "")
 
 # Dev diagnostics (optional)
 with st.expander("Dev: diagnostics", expanded=False):
-    st.write(f"{len(bootstrap)}")
+    st.write(f"bootstrap {bootstrap.version[:8]}: {len(bootstrap)} elements")
     st.write(
         f"entries: {len(league.get('league_entries') or [])} | "
         f"ownership_ids: {len(ownership_ids)} | fixtures: {len(fixtures)} | "
-        f"live players: {len(live_stats_map)}"
+        f"live players: {len(get_live_stats(gw))} | rows rebuilt: "
+        f"{st.session_state.get(f'{row_cache_key}_rebuilt')} | "
+        f"live refresh: {f'{REFRESH_EVERY}s' if REFRESH_EVERY else 'off'}"
     )
+    metrics.diagnostics()
 
     pid_probe = st.text_input("Probe element_id (e.g. 661)", value="")
     if pid_probe.strip().isdigit():
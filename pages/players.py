@@ -2,7 +2,7 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timezone
-from utils.helpers import compute_score, TEAM_COLOURS
+from utils.helpers import compute_scores, selected_league_id, team_colours
 try:
     from zoneinfo import ZoneInfo
 except Exception:
@@ -10,15 +10,21 @@ except Exception:
 
 from utils.api import (
     get_game_status,
-    get_bootstrap,
-    get_event_live,
+    get_bootstrap_store,
+    get_live_stats,
+    get_provisional_bonus,
     build_current_ownership_ids,
     league_entries_map,
 )
+from utils.warehouse import player_form
+from utils import metrics
+from utils.warmer import start_warmer
 
 st.set_page_config(layout="wide")
 
-LEAGUE_ID = 12260
+LEAGUE_ID = selected_league_id()
+metrics.start_rerun("players")
+start_warmer(LEAGUE_ID)  # background refresh of the shared caches
 LOCAL_TZ = ZoneInfo("Europe/London") if ZoneInfo else timezone.utc
 
 def now_str():
@@ -28,7 +34,7 @@ def style_owner(df, col="Owner"):
     if col not in df.columns:
         return df
     def _cell(v):
-        c = TEAM_COLOURS.get(str(v), "")
+        c = colours.get(str(v), "")
         return f"background-color: {c}" if c else ""
     return df.style.applymap(_cell, subset=[col])
 
@@ -39,10 +45,10 @@ from utils.api import get_fixtures
 status = get_game_status() or {}
 gw = status.get("current_event", 1)
 
-bootstrap = get_bootstrap() or {}
-players_by_id = {int(p["id"]): p for p in (bootstrap.get("elements") or [])}
-teams = {t["id"]: t["short_name"] for t in (bootstrap.get("teams") or [])}
-pos_map = {et["id"]: et["singular_name_short"] for et in (bootstrap.get("element_types") or [])}
+# shared, read-only bootstrap lookups (no per-rerun copy)
+store = get_bootstrap_store()
+players_by_id = store.elements
+teams = {tid: t.get("short_name") for tid, t in store.teams.items()}
 
 fixtures = get_fixtures(gw) or []
 # Map team_id -> fixture info
@@ -66,24 +72,12 @@ def get_fixture_label(team_id: int) -> str:
         opp_id = f.get("team_h")
     return f"vs. {teams.get(opp_id, '—')}"
 
-live = get_event_live(gw) or {}
-live_elements = live.get("elements", {})
-
-# Normalise live stats
-live_stats = {}
-if isinstance(live_elements, dict):
-    for k, v in live_elements.items():
-        try: pid = int(k)
-        except: continue
-        live_stats[pid] = v.get("stats", {}) or {}
-elif isinstance(live_elements, list):
-    for v in live_elements:
-        pid = v.get("id")
-        if pid is not None:
-            live_stats[int(pid)] = v.get("stats", {}) or {}
+live = get_live_stats(gw)
+prov_bonus = get_provisional_bonus(gw)
 
 ownership_ids = build_current_ownership_ids(LEAGUE_ID, gw, starters_only=False)
 entries_map = league_entries_map(LEAGUE_ID)
+colours = team_colours(entries_map.values())
 
 def fixture_status(team_id: int) -> str:
     f = fixture_map.get(team_id)
@@ -105,42 +99,39 @@ def fixture_status(team_id: int) -> str:
     return "—"
 
 # ---- Build dataframe
-rows = []
-for pid, pl in players_by_id.items():
-    stats = live_stats.get(pid, {})
-    eid = ownership_ids.get(pid)
-    owner = entries_map.get(eid, {}).get("entry_name", "—")
-    pos = pos_map.get(pl.get("element_type"), "")
-    team_id = pl.get("team")
-    status_str = fixture_status(team_id)
-
-    row = {
-        "Player": pl.get("web_name", f"#{pid}"),
-        "Pos": pos,
-        "Club": teams.get(team_id, ""),
-        "Owner": owner,
-        "Fixture": get_fixture_label(team_id),
-        "Fixture Status": status_str,
-        "Min": stats.get("minutes", 0),
-        "G": stats.get("goals_scored", 0),
-        "A": stats.get("assists", 0),
-        "CS": stats.get("clean_sheets", 0),
-        "GC": stats.get("goals_conceded", 0),
-        "YC": stats.get("yellow_cards", 0),
-        "RC": stats.get("red_cards", 0),
-        "OG": stats.get("own_goals", 0),
-        "PS": stats.get("penalties_saved", 0),
-        "PM": stats.get("penalties_missed", 0),
-        "SV": stats.get("saves", 0),
-        "B": stats.get("bonus", 0),
-        "BPS": stats.get("bps", 0),
-        "DC": stats.get("defensive_contribution", 0),
-        "API": stats.get("total_points", 0),
-        "Comp": compute_score(stats, pos),  # eventually pass bonus_override here
-    }
-    rows.append(row)
-
-df = pd.DataFrame(rows)
+# bulk join over the shared element model; fixture columns are per team (20), not per player
+info = store.players
+team_ids = info["team"]
+owner_names = {pid: entries_map.get(eid, {}).get("entry_name", "—") for pid, eid in ownership_ids.items()}
+df = pd.DataFrame({
+    "Player": info["web_name"].to_numpy(),
+    "Pos": info["position"].astype(object).fillna("").to_numpy(),
+    "Club": info["club"].astype(object).fillna("").to_numpy(),
+    "Owner": info.index.map(owner_names).fillna("—").to_numpy(),
+    "Fixture": team_ids.map({tid: get_fixture_label(tid) for tid in team_ids.unique()}).to_numpy(),
+    "Fixture Status": team_ids.map({tid: fixture_status(tid) for tid in team_ids.unique()}).to_numpy(),
+})
+
+# stats columns in bulk from the live store (0 for players with no live row)
+STAT_COLUMNS = {
+    "Min": "minutes", "G": "goals_scored", "A": "assists", "CS": "clean_sheets",
+    "GC": "goals_conceded", "YC": "yellow_cards", "RC": "red_cards", "OG": "own_goals",
+    "PS": "penalties_saved", "PM": "penalties_missed", "SV": "saves", "B": "bonus",
+    "BPS": "bps", "DC": "defensive_contribution", "API": "total_points",
+}
+if not df.empty:
+    stats_df = live.frame(info.index)
+    for col, stat in STAT_COLUMNS.items():
+        df[col] = stats_df[stat].to_numpy()
+    # provisional bonus where the fixture's official bonus isn't in yet
+    bonus_override = [prov_bonus.get(pid) for pid in info.index]
+    df["PB"] = [b if b is not None else raw for b, raw in zip(bonus_override, df["B"])]
+    # computed points for every player in one vectorised pass
+    df["Comp"] = compute_scores(stats_df, df["Pos"], bonus_override=bonus_override)
+    # history from the local warehouse (no API calls; backfilled by the warmer)
+    form = player_form(gw).reindex(info.index)
+    df["Form"] = form["Form"].fillna(0.0).to_numpy()
+    df["Season"] = form["Season"].fillna(0).astype(int).to_numpy()
 
 # ---- UI
 st.title(f"All Players — GW{gw}")
@@ -153,26 +144,34 @@ else:
     df = df.sort_values(["Owned?", "API"], ascending=[False, False])
     df = df.drop(columns=["Owned?"])
 
-    st.dataframe(
-        style_owner(df, col="Owner"),
-        use_container_width=True,
-        column_config={
-            "Fixture Status": st.column_config.TextColumn("Status", help="Fixture status (Not started / In play / Finished)"),
-            "Min": st.column_config.NumberColumn("Min", help="Minutes played"),
-            "G": st.column_config.NumberColumn("G", help="Goals scored"),
-            "A": st.column_config.NumberColumn("A", help="Assists"),
-            "CS": st.column_config.NumberColumn("CS", help="Clean sheets"),
-            "GC": st.column_config.NumberColumn("GC", help="Goals conceded"),
-            "YC": st.column_config.NumberColumn("YC", help="Yellow cards"),
-            "RC": st.column_config.NumberColumn("RC", help="Red cards"),
-            "OG": st.column_config.NumberColumn("OG", help="Own goals"),
-            "PS": st.column_config.NumberColumn("PS", help="Penalties saved"),
-            "PM": st.column_config.NumberColumn("PM", help="Penalties missed"),
-            "SV": st.column_config.NumberColumn("SV", help="Saves"),
-            "B": st.column_config.NumberColumn("B", help="Bonus"),
-            "BPS": st.column_config.NumberColumn("BPS", help="Bonus point system score"),
-            "DC": st.column_config.NumberColumn("DC", help="Defensive contribution"),
-            "API": st.column_config.NumberColumn("API", help="API total points"),
-            "Comp": st.column_config.NumberColumn("Comp", help="Computed total points"),
-        },
-    )
+    with metrics.timer("stage.players.styler"):
+        st.dataframe(
+            style_owner(df, col="Owner"),
+            use_container_width=True,
+            column_config={
+                "Fixture Status": st.column_config.TextColumn("Status", help="Fixture status (Not started / In play / Finished)"),
+                "Min": st.column_config.NumberColumn("Min", help="Minutes played"),
+                "G": st.column_config.NumberColumn("G", help="Goals scored"),
+                "A": st.column_config.NumberColumn("A", help="Assists"),
+                "CS": st.column_config.NumberColumn("CS", help="Clean sheets"),
+                "GC": st.column_config.NumberColumn("GC", help="Goals conceded"),
+                "YC": st.column_config.NumberColumn("YC", help="Yellow cards"),
+                "RC": st.column_config.NumberColumn("RC", help="Red cards"),
+                "OG": st.column_config.NumberColumn("OG", help="Own goals"),
+                "PS": st.column_config.NumberColumn("PS", help="Penalties saved"),
+                "PM": st.column_config.NumberColumn("PM", help="Penalties missed"),
+                "SV": st.column_config.NumberColumn("SV", help="Saves"),
+                "B": st.column_config.NumberColumn("B", help="Bonus"),
+                "PB": st.column_config.NumberColumn("PB", help="Bonus incl. provisional bonus for fixtures not yet confirmed"),
+                "BPS": st.column_config.NumberColumn("BPS", help="Bonus point system score"),
+                "DC": st.column_config.NumberColumn("DC", help="Defensive contribution"),
+                "API": st.column_config.NumberColumn("API", help="API total points"),
+                "Comp": st.column_config.NumberColumn("Comp", help="Computed total points (with provisional bonus)"),
+                "Form": st.column_config.NumberColumn("Form", help="Average points over the previous 5 GWs", format="%.1f"),
+                "Season": st.column_config.NumberColumn("Season", help="Total points before this GW"),
+            },
+        )
+
+# Dev diagnostics (optional)
+with st.expander("Dev: diagnostics", expanded=False):
+    metrics.diagnostics()
@@ -7,11 +7,16 @@ try:
 except Exception:
     ZoneInfo = None
 
-from utils.api import get_game_status, get_fixtures, get_bootstrap, get_league_details
+from utils.api import get_game_status, get_fixture_index, get_bootstrap_store, get_league_details
+from utils import metrics
+from utils.helpers import selected_league_id
+from utils.warmer import start_warmer
 
 st.set_page_config(layout="wide")
 
-LEAGUE_ID = 12260
+LEAGUE_ID = selected_league_id()
+metrics.start_rerun("preview")
+start_warmer(LEAGUE_ID)  # background refresh of the shared caches
 LOCAL_TZ = ZoneInfo("Europe/London") if ZoneInfo else timezone.utc
 
 def format_kickoff(iso_utc: str) -> str:
@@ -29,47 +34,63 @@ current_gw = status.get("current_event", 1)
 st.title("📋 Gameweek Preview")
 st.caption(f"Current GW: {current_gw}")
 
-tab_labels = [f"GW{i}" for i in range(1, 39)]
-tabs = st.tabs(tab_labels)
-
 league = get_league_details(LEAGUE_ID) or {}
-entry_map = {e["id"]: e for e in (league.get("league_entries") or []) if e.get("entry_id")}
+entry_names = {e["id"]: e.get("entry_name", "—") for e in (league.get("league_entries") or []) if e.get("entry_id")}
+
+# one season fixture fetch + one bootstrap for every gameweek
+fixtures_by_event = get_fixture_index()["by_event"]
+team_names = {tid: t.get("name") for tid, t in get_bootstrap_store().teams.items()}
+
+@st.cache_data(max_entries=128)
+def gw_tables(fixtures: list[dict], matches: list[dict], team_names: dict, entry_names: dict):
+    """
+    (PL fixtures table, H2H table) for one gameweek. Keyed on that GW's data,
+    so re-selecting a GW whose fixtures/matches haven't changed is a cache hit.
+    """
+    fix_table = []
+    for f in fixtures:
+        home = team_names.get(f.get("team_h")) or f.get("team_h")
+        away = team_names.get(f.get("team_a")) or f.get("team_a")
+        ko   = format_kickoff(f.get("kickoff_time"))
+        fix_table.append({"Home": home, "Away": away, "Kickoff": ko})
+
+    match_table = []
+    for m in matches:
+        match_table.append({
+            "Team A": entry_names.get(m["league_entry_1"], "—"),
+            "Pts A": m.get("league_entry_1_points", 0),
+            "Pts B": m.get("league_entry_2_points", 0),
+            "Team B": entry_names.get(m["league_entry_2"], "—"),
+        })
+    return pd.DataFrame(fix_table), pd.DataFrame(match_table)
+
+# Only the selected gameweek is built and rendered
+gw = st.select_slider(
+    "Gameweek",
+    options=list(range(1, 39)),
+    value=min(max(int(current_gw or 1), 1), 38),
+    format_func=lambda i: f"GW{i}",
+)
 
-for gw, tab in enumerate(tabs, start=1):
-    with tab:
-        st.subheader(f"Gameweek {gw}")
+st.subheader(f"Gameweek {gw}")
+fixtures = fixtures_by_event.get(gw) or []
+matches = [m for m in (league.get("matches") or []) if m.get("event") == gw]
+df_fix, df_match = gw_tables(fixtures, matches, team_names, entry_names)
 
-        # ---- Premier League fixtures
-        fixtures = get_fixtures(gw) or []
-        bootstrap = get_bootstrap() or {}
-        teams = {t["id"]: t for t in (bootstrap.get("teams") or [])}
+# ---- Premier League fixtures
+if not df_fix.empty:
+    st.markdown("**Premier League fixtures**")
+    st.table(df_fix)
+else:
+    st.info("No PL fixtures available.")
 
-        if fixtures:
-            fix_table = []
-            for f in fixtures:
-                home = teams.get(f.get("team_h"), {}).get("name", f.get("team_h"))
-                away = teams.get(f.get("team_a"), {}).get("name", f.get("team_a"))
-                ko   = format_kickoff(f.get("kickoff_time"))
-                fix_table.append({"Home": home, "Away": away, "Kickoff": ko})
-            st.markdown("**Premier League fixtures**")
-            st.table(pd.DataFrame(fix_table))
-        else:
-            st.info("No PL fixtures available.")
+# ---- Draft league matches (H2H)
+if not df_match.empty:
+    st.markdown("**Draft League H2H**")
+    st.table(df_match)
+else:
+    st.info("No Draft matches available for this GW.")
 
-        # ---- Draft league matches (H2H)
-        matches = [m for m in (league.get("matches") or []) if m.get("event") == gw]
-        if matches:
-            match_table = []
-            for m in matches:
-                home = entry_map.get(m["league_entry_1"], {}).get("entry_name", "—")
-                away = entry_map.get(m["league_entry_2"], {}).get("entry_name", "—")
-                match_table.append({
-                    "Team A": home,
-                    "Pts A": m.get("league_entry_1_points", 0),
-                    "Pts B": m.get("league_entry_2_points", 0),
-                    "Team B": away,
-                })
-            st.markdown("**Draft League H2H**")
-            st.table(pd.DataFrame(match_table))
-        else:
-            st.info("No Draft matches available for this GW.")
+# Dev diagnostics (optional)
+with st.expander("Dev: diagnostics", expanded=False):
+    metrics.diagnostics()
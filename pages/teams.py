@@ -7,26 +7,21 @@ try:
 except Exception:
     ZoneInfo = None
 
-from utils.api import get_game_status, build_gw_player_table, get_league_details
+from utils.api import get_game_status, build_gw_player_table, get_league_details, get_projected_scores
+from utils import metrics
+from utils.helpers import selected_league_id, team_colours
+from utils.warmer import start_warmer
 
 st.set_page_config(layout="wide")
 
-LEAGUE_ID = 12260
+LEAGUE_ID = selected_league_id()
+metrics.start_rerun("teams")
+start_warmer(LEAGUE_ID)  # background refresh of the shared caches
 LOCAL_TZ = ZoneInfo("Europe/London") if ZoneInfo else timezone.utc
 
 def now_str():
     return datetime.now(LOCAL_TZ).strftime("%a %d %b %Y, %H:%M:%S %Z")
 
-TEAM_COLOURS = {
-    "Ekitikekitike": "#ffadad",
-    "ØdegaardiansOfTheGal": "#ffd6a5",
-    "Ranger Things": "#fdffb6",
-    "Potter&The½FitWilson": "#caffbf",
-    "Bowen Arrow": "#9bf6ff",
-    "DioufFeelLuckyPunk?": "#a0c4ff",
-    "No Juan Eyed Bernabe": "#bdb2ff",
-}
-
 POS_ORDER = {"GKP": 1, "DEF": 2, "MID": 3, "FWD": 4}
 def lineup_rank(slot: str) -> int:
     if slot == "XI":
@@ -42,7 +37,7 @@ def style_owner(df, col="Owner"):
     if col not in df.columns:
         return df
     def _cell(v):
-        c = TEAM_COLOURS.get(str(v), "")
+        c = colours.get(str(v), "")
         return f"background-color: {c}" if c else ""
     return df.style.applymap(_cell, subset=[col])
 
@@ -51,6 +46,7 @@ status = get_game_status() or {}
 gw = status.get("current_event", 1)
 rows = build_gw_player_table(LEAGUE_ID, gw)
 league = get_league_details(LEAGUE_ID) or {}
+colours = team_colours(league.get("league_entries") or [])
 
 # Build GW points map + match info
 gw_points_map = {}
@@ -64,6 +60,10 @@ for m in (league.get("matches") or []):
 
 entry_map = {e["id"]: e for e in (league.get("league_entries") or []) if e.get("entry_id")}
 
+# live projected scores (auto-subs applied), league_entry id -> Projection
+projections = get_projected_scores(LEAGUE_ID, gw)
+projected = {le_id: projections.get(e["entry_id"]) for le_id, e in entry_map.items()}
+
 st.title(f"Teams — GW{gw}")
 st.caption(f"Last refresh: {now_str()}")
 
@@ -72,28 +72,35 @@ if not rows:
     st.stop()
 
 df = pd.DataFrame(rows)
+name_of = dict(zip(df["PlayerID"], df["Name"]))
 cols = ["Name","Position","Team","DraftRank","DraftedTo","GWPoints","Minutes","Contribs","LineupSlot"]
 df = df[cols].copy()
+df["pos_order"] = df["Position"].map(POS_ORDER).fillna(99).astype(int)
+df["lineup_order"] = df["LineupSlot"].map(lineup_rank).astype(int)
+
+# entry -> its rows, split once instead of masking the whole frame per tab
+rows_by_team = {name: d for name, d in df.groupby("DraftedTo", sort=True)}
+league_entry_ids = {e["entry_name"]: e["id"] for e in (league.get("league_entries") or [])}
 
-team_names = sorted(df["DraftedTo"].dropna().unique().tolist())
+team_names = list(rows_by_team)
 tabs = st.tabs(team_names)
 
 for name, tab in zip(team_names, tabs):
     with tab:
-        d = df[df["DraftedTo"] == name].copy()
-        d["pos_order"] = d["Position"].map(POS_ORDER).fillna(99).astype(int)
-        d["lineup_order"] = d["LineupSlot"].map(lineup_rank).astype(int)
-        d = d.sort_values(["lineup_order", "pos_order", "Name"], kind="mergesort")
-
-        # find entry_id
-        entry_id = None
-        for e in league.get("league_entries") or []:
-            if e["entry_name"] == name:
-                entry_id = e["id"]
-                break
+        d = rows_by_team[name].sort_values(["lineup_order", "pos_order", "Name"], kind="mergesort")
+
+        entry_id = league_entry_ids.get(name)
 
         team_points = gw_points_map.get(entry_id, "—")
-        st.markdown(f"**GW Points: {team_points}**")
+        proj = projected.get(entry_id)
+        if proj:
+            waiting = f" ({proj.pending} yet to play)" if proj.pending else ""
+            st.markdown(f"**GW Points: {team_points}** · Live projected: **{proj.points}**{waiting}")
+            if proj.subs:
+                st.caption("Auto-subs: " + ", ".join(
+                    f"{name_of.get(off, off)} → {name_of.get(on, on)}" for off, on in proj.subs))
+        else:
+            st.markdown(f"**GW Points: {team_points}**")
 
         # --- show score table with this team always on the left
         match = match_map.get(entry_id)
@@ -108,10 +115,13 @@ for name, tab in zip(team_names, tabs):
                 right_score = match.get("league_entry_1_points", 0)
 
             opp_name = entry_map.get(opp_id, {}).get("entry_name", "—")
+            opp_proj = projected.get(opp_id)
 
             score_data = pd.DataFrame([{
                 "Team": name,
                 "Score": left_score,
+                "Projected": proj.points if proj else "—",
+                "Opponent Projected": opp_proj.points if opp_proj else "—",
                 "Opponent Score": right_score,
                 "Opponent": opp_name
             }])
@@ -128,4 +138,9 @@ for name, tab in zip(team_names, tabs):
             "LineupSlot": "Slot"
         })[["Player","Pos","Club","Draft Rank","Owner","Slot","Minutes","GW Pts","Contribs"]]
 
-        st.table(style_owner(d_display, col="Owner"))
+        with metrics.timer("stage.teams.styler"):
+            st.table(style_owner(d_display, col="Owner"))
+
+# Dev diagnostics (optional)
+with st.expander("Dev: diagnostics", expanded=False):
+    metrics.diagnostics()
@@ -0,0 +1,57 @@
+# tests/test_scoring.py
+"""compute_scores (columnar) must agree with compute_score (per player) row for row."""
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks import payloads as pl
+from utils.helpers import SCORE_STATS, compute_score, compute_scores
+from utils.live import LiveStats
+
+
+def _loop(rows: list[dict], pos: list[str], override: list) -> list[int]:
+    return [compute_score(r, p, bonus_override=b) for r, p, b in zip(rows, pos, override)]
+
+
+def _check_payloads(data: dict) -> None:
+    boot = data["draft:/bootstrap-static"]
+    pos_of = {et["id"]: et["singular_name_short"] for et in boot["element_types"]}
+    element_type = {el["id"]: el["element_type"] for el in boot["elements"]}
+    live = LiveStats.from_payload(data[f"draft:/event/{pl.current_event(data)}/live"])
+    ids = [int(pid) for pid in live.ids if int(pid) in element_type]
+    pos = [pos_of[element_type[pid]] for pid in ids]
+    rows = [live.row(pid) for pid in ids]
+    stats = live.frame(ids)
+
+    assert compute_scores(stats, pos).tolist() == _loop(rows, pos, [None] * len(ids))
+
+    rnd = random.Random(0)
+    override = [rnd.choice((None, 0, 1, 2, 3)) for _ in ids]
+    assert compute_scores(stats, pos, bonus_override=override).tolist() == _loop(rows, pos, override)
+
+
+@pytest.mark.parametrize("n_entries, n_elements", [(7, 700), (20, 5000)])
+def test_matches_compute_score_on_synthetic_payloads(n_entries, n_elements):
+    _check_payloads(pl.synthesize(n_entries, n_elements))
+
+
+def test_matches_compute_score_on_recorded_payloads():
+    recorded = pl.load()
+    if not recorded:
+        pytest.skip(f"no payloads recorded under {pl.PAYLOAD_DIR} (python -m benchmarks.record)")
+    _check_payloads(recorded)
+
+
+def test_matches_compute_score_on_random_rows():
+    # every stat non-zero somewhere (the synthetic payloads leave cards, pens, OGs at 0)
+    rnd = random.Random(1)
+    n = 5000
+    rows = [{k: rnd.choice((0, 0, 1, 2, 3, 7, 13)) for k in SCORE_STATS} for _ in range(n)]
+    for r in rows:
+        r["minutes"] = rnd.choice((0, 1, 59, 60, 90))
+    pos = [rnd.choice(("GKP", "DEF", "MID", "FWD")) for _ in range(n)]
+    override = [rnd.choice((None, np.nan, 0, 3)) for _ in range(n)]
+    expected = _loop(rows, pos, [None if b is None or b != b else b for b in override])
+    assert compute_scores(pd.DataFrame(rows), pos, bonus_override=override).tolist() == expected
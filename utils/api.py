@@ -1,67 +1,222 @@
 # utils/api.py
-import requests
+import os
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
+
+import numpy as np
 import pandas as pd
-import streamlit as st
 
-DRAFT_BASE = "https://draft.premierleague.com/api"
-FPL_BASE   = "https://fantasy.premierleague.com/api"
+from utils import metrics
+from utils.autosub import Projection, formation_limits, project_scores, teams_done
+from utils.bonus import provisional_bonus
+from utils.bootstrap import BootstrapStore, payload_version
+from utils.client import fetch_json, fetch_many
+from utils.helpers import format_contribs_many
+from utils.live import LiveStats, LiveTracker
+from utils.standings import LiveStandings
+from utils.swr import UpstreamError, swr_cache
+from utils.ttl import fixtures_ttl, live_ttl
 
-def _get_json(url: str, default):
-    try:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        return r.json()
-    except Exception:
-        return default
+# overridable so the app can run against the replay server (benchmarks/replay_server.py)
+DRAFT_BASE = os.environ.get("FPL_DRAFT_BASE", "https://draft.premierleague.com/api").rstrip("/")
+FPL_BASE   = os.environ.get("FPL_FPL_BASE", "https://fantasy.premierleague.com/api").rstrip("/")
+
+# In-memory TTL for the fixture-state-driven fetchers. A memory miss only
+# re-reads the disk cache; whether that goes upstream is decided by the
+# adaptive disk TTL (utils/ttl.py): ~20s with a fixture in play, hours between GWs.
+ADAPTIVE_MEMORY_TTL = 20
+
+# Bootstrap, fixtures and event-live are global (one cache entry for every
+# league); league-scoped entries are capped so serving many leagues via
+# ?league=<id> keeps memory proportional to the leagues actually being viewed.
+MAX_LEAGUES = int(os.environ.get("FPL_MAX_LEAGUES", 64))
+MAX_ENTRIES = MAX_LEAGUES * 16  # draft leagues have at most 16 entries
+
+_FAILED = object()
 
-@st.cache_data(ttl=300)
+def _get_json(url: str, ttl: float = 0, immutable: bool = False):
+    # all fetchers share one pooled session (keep-alive, retries, gzip)
+    # and the on-disk response cache (see utils/disk_cache.py);
+    # failures raise so swr_cache can keep serving the last good value
+    data = fetch_json(url, _FAILED, ttl=ttl, immutable=immutable)
+    if data is _FAILED:
+        raise UpstreamError(url)
+    return data
+
+def _event_finished(event: int) -> bool:
+    """True once a GW is finished and its data checked; its payloads never change after that."""
+    ev = get_bootstrap_store().event(event)
+    return bool(ev.get("finished")) and ev.get("data_checked", True) is not False
+
+# Raw fetchers are stale-while-revalidate (utils/swr.py): an expired entry is
+# served at once and refreshed in the background, and an upstream failure
+# keeps the last good payload instead of blanking the page with `default`.
+
+@swr_cache(ttl=300, default={})
 def get_game_status():
     """
     Draft endpoint that includes current_event / next_event, etc.
     Example keys: current_event, next_event, processing_status, waivers_processed...
     """
-    return _get_json(f"{DRAFT_BASE}/game", default={})
+    return _get_json(f"{DRAFT_BASE}/game", ttl=300)
 
-@st.cache_data(ttl=300)
+@swr_cache(ttl=300, default={}, max_entries=MAX_LEAGUES)
 def get_league_details(league_id: int):
-    return requests.get(f"{DRAFT_BASE}/league/{league_id}/details", timeout=10).json()
+    return _get_json(f"{DRAFT_BASE}/league/{league_id}/details", ttl=300)
 
-@st.cache_data(ttl=300)
+@swr_cache(ttl=300, default={})
 def get_bootstrap():
-    """Fantasy endpoint with teams/elements."""
-    return _get_json(f"{DRAFT_BASE}/bootstrap-static", default={})
+    """Fantasy endpoint with teams/elements (a private copy; prefer get_bootstrap_store)."""
+    return _get_json(f"{DRAFT_BASE}/bootstrap-static", ttl=300)
 
-@st.cache_data(ttl=300)
-def get_fixtures(event: int):
+_bootstrap_store: BootstrapStore | None = None
+
+@swr_cache(ttl=300, shared=True)
+def get_bootstrap_store() -> BootstrapStore:
+    """
+    Frozen bootstrap lookups shared by every session without copying
+    (utils/bootstrap.py); only rebuilt when the payload actually changes.
+    Stale-while-revalidate like the raw fetchers: an expired store is served
+    while the next one is fetched and built in the background.
+    """
+    global _bootstrap_store
+    try:
+        payload = _get_json(f"{DRAFT_BASE}/bootstrap-static", ttl=300)
+    except UpstreamError as e:
+        # nothing cached yet: serve an empty store for now (not cached, so the next call retries)
+        raise UpstreamError(str(e), partial=_bootstrap_store or BootstrapStore({})) from e
+    version = payload_version(payload)
+    if _bootstrap_store is None or _bootstrap_store.version != version:
+        _bootstrap_store = BootstrapStore(payload, version)
+    return _bootstrap_store
+
+@swr_cache(ttl=6 * 3600, default=[])
+def get_season_fixtures():
+    """Fantasy endpoint with every fixture of the season (unfiltered). Returns a list."""
+    return _get_json(f"{FPL_BASE}/fixtures", ttl=6 * 3600)
+
+def event_fixtures_ttl(event: int) -> int:
+    """Disk TTL for /fixtures?event=N, from the (long-cached) season kickoff times."""
+    season = [f for f in (get_season_fixtures() or []) if f.get("event") == event]
+    return fixtures_ttl(season, get_game_status())
+
+def event_live_ttl(event: int) -> int:
+    """Disk TTL for /event/N/live, from the GW's current fixture state and /game processing flags."""
+    return live_ttl(get_fixtures(event), get_game_status())
+
+@swr_cache(ttl=ADAPTIVE_MEMORY_TTL, default=[])
+def get_event_fixtures(event: int):
     """Fantasy endpoint for fixtures by event (gameweek). Returns a list."""
-    return _get_json(f"{FPL_BASE}/fixtures?event={event}", default=[])
+    return _get_json(f"{FPL_BASE}/fixtures?event={event}",
+                     ttl=event_fixtures_ttl(event), immutable=_event_finished(event))
+
+@swr_cache(ttl=ADAPTIVE_MEMORY_TTL, shared=True)
+def get_fixture_index() -> Mapping[str, Mapping[int, tuple]]:
+    """
+    Season fixtures indexed once:
+      {"by_event": {event: (fixtures,)}, "by_team": {team_id: (fixtures,)}}
+    The season list is long-cached (finished/upcoming fixtures rarely change);
+    only the current GW and any GW with a fixture in play are re-read often.
+    Shared like the BootstrapStore: every caller gets the same read-only
+    index, so a hit doesn't unpickle the season's fixtures (callers must not
+    mutate the fixture dicts).
+    """
+    season = {f["id"]: f for f in (get_season_fixtures() or []) if f.get("id") is not None}
 
-@st.cache_data(ttl=300)
+    current = (get_game_status() or {}).get("current_event")
+    active = {f.get("event") for f in season.values() if f.get("started") and not f.get("finished")}
+    if current:
+        active.add(current)
+    for event in active:
+        if event is None:
+            continue
+        for f in (get_event_fixtures(event) or []):
+            if f.get("id") is not None:
+                season[f["id"]] = f
+
+    by_event: dict[int, list] = {}
+    by_team: dict[int, list] = {}
+    for f in sorted(season.values(), key=lambda x: (x.get("kickoff_time") or "", x["id"])):
+        by_event.setdefault(f.get("event"), []).append(f)
+        for side in ("team_h", "team_a"):
+            if f.get(side):
+                by_team.setdefault(f[side], []).append(f)
+    return MappingProxyType({
+        "by_event": MappingProxyType({e: tuple(fs) for e, fs in by_event.items()}),
+        "by_team": MappingProxyType({t: tuple(fs) for t, fs in by_team.items()}),
+    })
+
+def get_fixtures(event: int):
+    """Fixtures for one event (gameweek), read from the season index. Returns a sequence."""
+    fixtures = get_fixture_index()["by_event"].get(event)
+    if fixtures is None:
+        # season list unavailable/incomplete: fall back to the per-event endpoint
+        return get_event_fixtures(event) or []
+    return fixtures
+
+@swr_cache(ttl=300, default={"choices": []}, max_entries=MAX_LEAGUES)
 def get_draft_choices(league_id: int):
     """
     Draft endpoint for who owns which players.
     Shape: {"choices": [ { "element": <player_id>, "entry_name": <team name>, ... }, ... ]}
     """
-    return _get_json(f"{DRAFT_BASE}/draft/league/{league_id}/choices", default={"choices":[]})
+    return _get_json(f"{DRAFT_BASE}/draft/league/{league_id}/choices", ttl=300)
 
-@st.cache_data(ttl=120)  # shorter cache; squads can change with waivers
+@swr_cache(ttl=60, default={"element_status": []}, max_entries=MAX_LEAGUES)
+def get_element_status(league_id: int):
+    """
+    Draft endpoint with the current owner of every element in the league.
+    Shape: {"element_status": [ {"element": 170, "owner": <entry_id>|None, "status": "o"|"a"|"w", ...}, ... ]}
+    """
+    return _get_json(f"{DRAFT_BASE}/league/{league_id}/element-status", ttl=60)
+
+@swr_cache(ttl=120, default={}, max_entries=MAX_ENTRIES)  # shorter cache; squads can change with waivers
 def get_entry_event(entry_id: int, event: int):
     # Current squad (picks) for a given entry + GW
-    return _get_json(f"{DRAFT_BASE}/entry/{entry_id}/event/{event}", default={})
+    return _get_json(f"{DRAFT_BASE}/entry/{entry_id}/event/{event}",
+                     ttl=120, immutable=_event_finished(event))
+
+@swr_cache(ttl=120, default={}, max_entries=MAX_LEAGUES)
+def fetch_entry_events(entry_ids: tuple[int, ...], event: int) -> dict[int, dict]:
+    """
+    entry_id -> /entry/{id}/event/{gw} payload for every entry, fetched
+    concurrently so the batch costs roughly one round-trip, not N.
+    Any failed entry keeps the whole last good batch; with none, the rest are still returned.
+    """
+    ids = [int(e) for e in entry_ids]
+    urls = [f"{DRAFT_BASE}/entry/{eid}/event/{event}" for eid in ids]
+    bodies = fetch_many(urls, default=None, ttl=120, immutable=_event_finished(event))
+    out = {eid: (body or {}) for eid, body in zip(ids, bodies)}
+    if any(body is None for body in bodies):
+        raise UpstreamError(f"{DRAFT_BASE}/entry/*/event/{event}", partial=out)
+    return out
 
-@st.cache_data(ttl=300)
+@swr_cache(ttl=ADAPTIVE_MEMORY_TTL, default={})
 def get_event_live(event_id: int):
-    return requests.get(f"{DRAFT_BASE}/event/{event_id}/live").json()
+    return _get_json(f"{DRAFT_BASE}/event/{event_id}/live",
+                     ttl=event_live_ttl(event_id), immutable=_event_finished(event_id))
+
+@metrics.cache_data(ttl=ADAPTIVE_MEMORY_TTL)
+def get_live_stats(event_id: int) -> LiveStats:
+    """/event/{gw}/live parsed once into the columnar LiveStats store."""
+    payload = get_event_live(event_id) or {}
+    with metrics.timer("stage.live.normalise"):
+        return LiveStats.from_payload(payload)
+
+@metrics.cache_resource
+def get_live_tracker(event_id: int) -> LiveTracker:
+    """One shared delta tracker per GW (previous snapshot + change feed)."""
+    return LiveTracker()
 
 
 # utils/api.py (append this to the bottom)
 
 # --- Ownership: rely only on actual GW picks --- #
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Tuple
+from typing import Dict, Mapping, Tuple
 
-@st.cache_data(ttl=300)
+@metrics.cache_data(ttl=300, max_entries=MAX_LEAGUES)
 def league_entries_map(league_id: int) -> Dict[int, dict]:
     """entry_id -> league_entry object (has entry_name, etc)."""
     league = get_league_details(league_id) or {}
@@ -74,17 +229,26 @@ def league_entries_map(league_id: int) -> Dict[int, dict]:
                 pass
     return out
 
-@st.cache_data(ttl=60)
-def build_current_ownership_ids(league_id: int, event_id: int, starters_only: bool = False) -> Dict[int, int]:
-    """
-    element_id -> owner's entry_id for the specified GW,
-    built ONLY from /entry/{id}/event/{gw} picks (truth source).
-    """
+@metrics.timed("stage.ownership.element_status")
+def _ownership_from_element_status(league_id: int) -> Dict[int, int]:
+    ownership_ids: Dict[int, int] = {}
+    for row in (get_element_status(league_id) or {}).get("element_status") or []:
+        owner = row.get("owner")
+        if owner is None:
+            continue
+        try:
+            ownership_ids[int(row["element"])] = int(owner)
+        except Exception:
+            continue
+    return ownership_ids
+
+@metrics.timed("stage.ownership.picks")
+def _ownership_from_picks(league_id: int, event_id: int, starters_only: bool) -> Dict[int, int]:
     entries = league_entries_map(league_id)
+    picks_by_entry = fetch_entry_events(tuple(sorted(entries)), event_id)
     ownership_ids: Dict[int, int] = {}
 
-    def fetch_one(entry_id: int):
-        data = get_entry_event(entry_id, event_id) or {}
+    for entry_id, data in picks_by_entry.items():
         for p in (data.get("picks") or []):
             try:
                 pid  = int(p.get("element"))
@@ -95,14 +259,31 @@ def build_current_ownership_ids(league_id: int, event_id: int, starters_only: bo
                 continue
             ownership_ids[pid] = entry_id
 
-    with ThreadPoolExecutor(max_workers=min(8, max(1, len(entries)))) as ex:
-        futures = [ex.submit(fetch_one, eid) for eid in entries.keys()]
-        for _ in as_completed(futures):
-            pass
-
     return ownership_ids
 
-@st.cache_data(ttl=60)
+def _element_status_is_current(event_id: int) -> bool:
+    """
+    element-status only knows who owns a player *now*. That matches the GW
+    picks while `event_id` is the current GW and waivers for the next GW
+    haven't been processed yet.
+    """
+    status = get_game_status() or {}
+    return status.get("current_event") == event_id and not status.get("waivers_processed")
+
+@metrics.cache_data(ttl=60, max_entries=MAX_LEAGUES)
+def build_current_ownership_ids(league_id: int, event_id: int, starters_only: bool = False) -> Dict[int, int]:
+    """
+    element_id -> owner's entry_id for the specified GW.
+    Current GW: one /league/{id}/element-status call.
+    Historic GWs, or starters_only (needs lineup slots): /entry/{id}/event/{gw} picks.
+    """
+    if not starters_only and _element_status_is_current(event_id):
+        ownership_ids = _ownership_from_element_status(league_id)
+        if ownership_ids:
+            return ownership_ids
+    return _ownership_from_picks(league_id, event_id, starters_only)
+
+@metrics.cache_data(ttl=60, max_entries=MAX_LEAGUES)
 def build_current_ownership(league_id: int, event_id: int, starters_only: bool = False) -> Dict[int, str]:
     """
     Back-compat shim: element_id -> owner's entry_name (derived from entry_id).
@@ -111,6 +292,68 @@ def build_current_ownership(league_id: int, event_id: int, starters_only: bool =
     entries = league_entries_map(league_id)
     return {pid: entries.get(eid, {}).get("entry_name", "—") for pid, eid in ids.items()}
 
+def who_owns_element(league_id: int, event_id: int, element_id: int) -> Tuple[int | None, str]:
+    """(entry_id, entry_name) of the element's owner for the GW; (None, "—") if unowned."""
+    eid = build_current_ownership_ids(league_id, event_id).get(int(element_id))
+    if eid is None:
+        return None, "—"
+    return eid, league_entries_map(league_id).get(eid, {}).get("entry_name", "—")
+
+
+# --- Lookup indexes (rebuilt only when their inputs change) --- #
+
+def get_team_players() -> Mapping[int, tuple[int, ...]]:
+    """team_id -> element ids, prebuilt once per bootstrap payload."""
+    return get_bootstrap_store().team_players
+
+@lru_cache(maxsize=MAX_LEAGUES)
+def _owned_index(bootstrap_version: str,
+                 ownership: tuple[tuple[int, int], ...],
+                 fixture_teams: tuple[tuple[int, int, int], ...]) -> dict:
+    # keyed on the bootstrap *version*: the element -> team map is read from
+    # the shared store, not hashed as a whole-dataset argument on every call
+    elements = get_bootstrap_store().elements
+    by_team: Dict[int, list[int]] = {}
+    by_entry: Dict[int, list[int]] = {}
+    for pid, eid in ownership:
+        by_entry.setdefault(eid, []).append(pid)
+        by_team.setdefault(elements.get(pid, {}).get("team"), []).append(pid)
+    by_fixture = {
+        fid: by_team.get(home, []) + by_team.get(away, [])
+        for fid, home, away in fixture_teams
+    }
+    return {"fixture": by_fixture, "entry": by_entry}
+
+def build_owned_index(league_id: int, event_id: int) -> dict:
+    """
+    {"fixture": fixture_id -> [owned element ids], "entry": entry_id -> [element ids]}
+    for the GW. Keyed on the bootstrap version plus the (small) owned-player
+    and fixture tuples, so it is only rebuilt when one of those actually
+    changes. Shared between callers: read-only.
+    """
+    ownership = tuple(sorted(build_current_ownership_ids(league_id, event_id).items()))
+    fixture_teams = tuple(
+        (f["id"], f.get("team_h"), f.get("team_a"))
+        for f in (get_fixtures(event_id) or []) if f.get("id") is not None
+    )
+    return _owned_index(get_bootstrap_store().version, ownership, fixture_teams)
+
+
+@metrics.cache_data(ttl=ADAPTIVE_MEMORY_TTL)
+def get_provisional_bonus(event_id: int) -> Dict[int, int]:
+    """
+    element_id -> bonus to score with for players in fixtures whose official
+    bonus isn't in yet (see utils/bonus.py); pass as compute_score's bonus_override.
+    """
+    return provisional_bonus(get_fixtures(event_id) or [], get_live_stats(event_id), get_team_players())
+
+def live_points(live: LiveStats, prov_bonus: Dict[int, int], pid: int) -> int:
+    """API total_points with the official bonus swapped for the provisional one where pending."""
+    points = live.get(pid, "total_points")
+    if pid in prov_bonus:
+        points += prov_bonus[pid] - live.get(pid, "bonus")
+    return points
+
 
 def compute_slot(mult: int | None, posn: int | None) -> str:
     try:
@@ -134,7 +377,16 @@ def compute_slot(mult: int | None, posn: int | None) -> str:
         return "Bench ?"
     return "Unknown"
 
-@st.cache_data(ttl=30)
+def compute_slots(mult: np.ndarray, posn: np.ndarray) -> list[str]:
+    """compute_slot over whole pick arrays (posn 0 = missing)."""
+    bench = np.char.add("Bench ", (posn - 11).astype(str))
+    return np.select(
+        [(posn >= 1) & (posn <= 11), (posn >= 12) & (posn <= 15), mult > 0, mult == 0],
+        ["XI", bench, "XI", "Bench ?"],
+        default="Unknown",
+    ).tolist()
+
+@metrics.cache_data(ttl=30, max_entries=MAX_LEAGUES)
 def build_gw_player_table(league_id: int, event_id: int) -> list[dict]:
     """
     One row per player currently owned in the league for the GW.
@@ -144,27 +396,11 @@ def build_gw_player_table(league_id: int, event_id: int) -> list[dict]:
     league = get_league_details(league_id) or {}
     entries = [e for e in (league.get("league_entries") or []) if e.get("entry_id")]
 
-    bootstrap = get_bootstrap() or {}
-    elements = {p["id"]: p for p in (bootstrap.get("elements") or [])}
-    teams = {t["id"]: t for t in (bootstrap.get("teams") or [])}
-    etypes = {et["id"]: et for et in (bootstrap.get("element_types") or [])}
-    pos_name = lambda et_id: etypes.get(et_id, {}).get("singular_name_short", "")
-
-    # live stats (minutes, points, etc.)
-    live = get_event_live(event_id) or {}
-    live_elements = live.get("elements", {})
-    stats_map = {}
-    if isinstance(live_elements, dict):
-        for k, v in live_elements.items():
-            try:
-                stats_map[int(k)] = v.get("stats") or {}
-            except Exception:
-                continue
-    else:
-        for v in (live_elements or []):
-            pid = v.get("id")
-            if pid is not None:
-                stats_map[int(pid)] = v.get("stats") or {}
+    store = get_bootstrap_store()
+
+    # live stats (minutes, points, etc.) + provisional bonus for unconfirmed fixtures
+    live = get_live_stats(event_id)
+    prov_bonus = get_provisional_bonus(event_id)
 
     # draft choices -> potential draft rank
     choices = get_draft_choices(league_id) or {}
@@ -195,53 +431,98 @@ def build_gw_player_table(league_id: int, event_id: int) -> list[dict]:
                 except Exception:
                     pass
 
-    # ownership + bench order via entry/{id}/event/{gw}
-    rows: list[dict] = []
-    for e in entries:
-        entry_id = int(e["entry_id"])
-        entry_name = e["entry_name"]
-        picks = (get_entry_event(entry_id, event_id) or {}).get("picks") or []
-        for p in picks:
+    # ownership + bench order via entry/{id}/event/{gw} (one concurrent batch)
+    picks_by_entry = fetch_entry_events(tuple(sorted(int(e["entry_id"]) for e in entries)), event_id)
+    with metrics.timer("stage.players.rows"):
+        picks: list[tuple[int, str, int, int, int]] = []
+        for e in entries:
+            entry_id = int(e["entry_id"])
+            for p in (picks_by_entry.get(entry_id) or {}).get("picks") or []:
+                try:
+                    picks.append((entry_id, e["entry_name"], int(p.get("element")),
+                                  int(p.get("multiplier", 0)), int(p.get("position", 0))))  # position 1..15 expected
+                except Exception:
+                    continue
+        if not picks:
+            return []
+        entry_ids, entry_names, ids, mult, posn = (list(c) for c in zip(*picks))
+
+        # bulk joins against the bootstrap element model and the live store
+        info = store.players.reindex(ids)
+        stats = live.frame(ids)
+        bonus = stats["bonus"].to_numpy()
+        prov = np.fromiter((prov_bonus.get(pid, b) for pid, b in zip(ids, bonus)), dtype=np.int64, count=len(ids))
+
+        columns = {
+            "Name": [n if isinstance(n, str) else f"Player {pid}" for n, pid in zip(info["web_name"].tolist(), ids)],
+            "Position": info["position"].astype(object).fillna("").tolist(),
+            "Team": info["club"].astype(object).fillna("").tolist(),
+            "DraftRank": [draft_map.get(pid) for pid in ids],
+            "DraftedTo": entry_names,
+            "GWPoints": (stats["total_points"].to_numpy() - bonus + prov).tolist(),  # provisional bonus where pending
+            "Minutes": stats["minutes"].tolist(),
+            "Contribs": format_contribs_many(stats, [pid in live for pid in ids]),
+            "LineupSlot": compute_slots(np.array(mult), np.array(posn)),
+            "PlayerID": ids,  # handy for debugging/filtering
+            "EntryID": entry_ids,
+        }
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+# --- Live projected scores (auto-subs applied) --- #
+
+def _lineups(league_id: int, event_id: int) -> tuple[tuple[int, tuple[tuple[int, int], ...]], ...]:
+    """((entry_id, ((element, position), ...)), ...) from every entry's GW picks."""
+    picks_by_entry = fetch_entry_events(tuple(sorted(league_entries_map(league_id))), event_id)
+    out = []
+    for entry_id, data in sorted(picks_by_entry.items()):
+        picks = []
+        for p in (data.get("picks") or []):
             try:
-                pid = int(p.get("element"))
-                mult = int(p.get("multiplier", 0))
-                posn = int(p.get("position", 0))  # 1..15 expected
+                picks.append((int(p["element"]), int(p["position"])))
             except Exception:
                 continue
-            pl = elements.get(pid, {})
-            tm = teams.get(pl.get("team"), {})
-            stats = stats_map.get(pid, {})
-            minutes = int(stats.get("minutes", 0))
-            points = int(stats.get("total_points", 0))
-
-            contribs = []
-            if "minutes" in stats: contribs.append(f"min+{stats['minutes']}")
-            if stats.get("goals_scored"): contribs.append(f"g+{stats['goals_scored']}")
-            if stats.get("assists"): contribs.append(f"a+{stats['assists']}")
-            if stats.get("clean_sheets"): contribs.append(f"cs+{stats['clean_sheets']}")
-            if stats.get("goals_conceded"): contribs.append(f"gc+{stats['goals_conceded']}")
-            if stats.get("yellow_cards"): contribs.append(f"yc+{stats['yellow_cards']}")
-            if stats.get("red_cards"): contribs.append(f"rc+{stats['red_cards']}")
-            if stats.get("saves"): contribs.append(f"saves+{stats['saves']}")
-            if stats.get("bonus"): contribs.append(f"b+{stats['bonus']}")
-            if "bps" in stats: contribs.append(f"bps+{stats['bps']}")
-            if "defensive_contribution" in stats: contribs.append(f"def+{stats['defensive_contribution']}")
-
-            # lineup slot
-            slot = compute_slot(mult, posn)
-
-            rows.append({
-                "Name": pl.get("web_name", f"Player {pid}"),
-                "Position": pos_name(pl.get("element_type")),
-                "Team": tm.get("short_name", ""),
-                "DraftRank": draft_map.get(pid, None),
-                "DraftedTo": entry_name,
-                "GWPoints": points,
-                "Minutes": minutes,
-                "Contribs": " ".join(contribs) if contribs else "—",
-                "LineupSlot": slot,
-                "PlayerID": pid,  # handy for debugging/filtering
-                "EntryID": entry_id,
-            })
-
-    return rows
+        out.append((entry_id, tuple(sorted(picks))))
+    return tuple(out)
+
+@metrics.cache_data(max_entries=MAX_LEAGUES)
+def _projected_scores(lineups: tuple, event_id: int, live_version: str,
+                      fixture_state: tuple[tuple[int, int, bool], ...]) -> dict[int, Projection]:
+    store = get_bootstrap_store()
+    done = teams_done([{"team_h": h, "team_a": a, "finished": over} for h, a, over in fixture_state])
+    return project_scores(dict(lineups), get_live_stats(event_id), get_provisional_bonus(event_id),
+                          store.players, done, formation_limits(store.element_types))
+
+def get_projected_scores(league_id: int, event_id: int) -> dict[int, Projection]:
+    """
+    entry_id -> live Projection (auto-subs applied, see utils/autosub.py) for
+    every entry in the league. Keyed on the lineups, the live-data version and
+    the fixtures' finished state, so it only reruns when one of those moves;
+    entries whose players didn't change come straight from project_entry's memo.
+    """
+    fixture_state = tuple(
+        (f.get("team_h"), f.get("team_a"), bool(f.get("finished") or f.get("finished_provisional")))
+        for f in (get_fixtures(event_id) or [])
+    )
+    return _projected_scores(_lineups(league_id, event_id), event_id,
+                             get_live_stats(event_id).version, fixture_state)
+
+@metrics.cache_resource(max_entries=MAX_LEAGUES)
+def get_live_standings(league_id: int) -> LiveStandings:
+    """One shared live table per league (see utils/standings.py)."""
+    return LiveStandings()
+
+def live_league_table(league_id: int, event_id: int) -> tuple[dict, ...]:
+    """
+    Standings with the projected result of the event's unfinished matches,
+    ranked live (rows as in LiveStandings.table). Shared by every viewer of
+    the league; only the rows of matches whose projection moved are reworked.
+    """
+    league = get_league_details(league_id) or {}
+    projections = get_projected_scores(league_id, event_id)
+    projected = {
+        e["id"]: projections[e["entry_id"]].points
+        for e in (league.get("league_entries") or []) if e.get("entry_id") in projections
+    }
+    matches = [m for m in (league.get("matches") or []) if m.get("event") == event_id]
+    return get_live_standings(league_id).update(league.get("standings") or [], matches, projected)
@@ -0,0 +1,133 @@
+# utils/autosub.py
+"""
+Automatic substitutions and projected H2H scores for every entry of a league.
+
+Draft auto-sub rules: a starter with no minutes is replaced once all of
+their team's fixtures for the GW are finished (or the team has none), by the
+first bench player in bench order who played and keeps the formation legal
+(bootstrap `squad_min_play` / `squad_max_play`: 1 GKP, 3+ DEF, 2+ MID, 1+ FWD).
+A bench player whose game is still to come holds their place in the order:
+the sub waits for them instead of skipping ahead.
+
+All picks of the league are joined against the live store in one batch, then
+each entry's lineup is resolved by project_entry, memoised on the (slot,
+position, points, state) of its 15 picks, so a live refresh only reworks the
+entries whose players moved.
+"""
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+
+from utils.live import LiveStats
+
+PLAYED, OUT, PENDING = "played", "out", "pending"
+
+# element_type -> (min, max) in the XI, when bootstrap doesn't list them
+DEFAULT_LIMITS = {1: (1, 1), 2: (3, 5), 3: (2, 5), 4: (1, 3)}
+
+# (element, lineup position 1..15, element_type, points, state)
+Pick = tuple[int, int, int, int, str]
+
+
+@dataclass(frozen=True)
+class Projection:
+    """
+    points:  projected score of the final XI (live points with provisional bonus)
+    xi:      element ids that score, after auto-subs
+    subs:    (off, on) element ids, in the order they were made
+    pending: starters yet to play, or waiting on a bench player who is
+    """
+    points: int
+    xi: tuple[int, ...]
+    subs: tuple[tuple[int, int], ...] = ()
+    pending: int = 0
+
+
+def formation_limits(element_types: Mapping[int, Mapping]) -> tuple[tuple[int, tuple[int, int]], ...]:
+    """((element_type, (min, max)), ...) for the XI, from bootstrap element_types."""
+    limits = dict(DEFAULT_LIMITS)
+    for et, t in element_types.items():
+        lo, hi = t.get("squad_min_play"), t.get("squad_max_play")
+        if lo is not None and hi is not None:
+            limits[int(et)] = (int(lo), int(hi))
+    return tuple(sorted(limits.items()))
+
+
+def teams_done(fixtures: list[dict]) -> dict[int, bool]:
+    """team_id -> True once every GW fixture of the team is over; teams without a fixture are absent."""
+    done: dict[int, bool] = {}
+    for f in fixtures:
+        over = bool(f.get("finished") or f.get("finished_provisional"))
+        for side in ("team_h", "team_a"):
+            tid = f.get(side)
+            if tid:
+                done[tid] = done.get(tid, True) and over
+    return done
+
+
+def _legal(counts: Counter, limits: tuple[tuple[int, tuple[int, int]], ...]) -> bool:
+    return all(lo <= counts[et] <= hi for et, (lo, hi) in limits)
+
+
+@lru_cache(maxsize=4096)
+def project_entry(picks: tuple[Pick, ...], limits: tuple[tuple[int, tuple[int, int]], ...]) -> Projection:
+    """Apply auto-subs to one entry's picks and total the final XI."""
+    ordered = sorted(picks, key=lambda p: p[1])
+    xi = [p for p in ordered if p[1] <= 11]
+    bench = [p for p in ordered if p[1] > 11]
+    counts = Counter(p[2] for p in xi)
+    subs, pending = [], 0
+
+    for i, starter in enumerate(xi):
+        if starter[4] == PENDING:
+            pending += 1
+        if starter[4] != OUT:
+            continue
+        for b in bench:
+            trial = counts.copy()
+            trial[starter[2]] -= 1
+            trial[b[2]] += 1
+            if b[4] == OUT or not _legal(trial, limits):
+                continue
+            if b[4] == PENDING:
+                pending += 1  # next in line hasn't played yet: hold the sub
+            else:
+                xi[i], counts = b, trial
+                bench.remove(b)
+                subs.append((starter[0], b[0]))
+            break
+
+    return Projection(sum(p[3] for p in xi), tuple(p[0] for p in xi), tuple(subs), pending)
+
+
+def project_scores(lineups: Mapping[int, tuple[tuple[int, int], ...]], live: LiveStats,
+                   prov_bonus: Mapping[int, int], players: pd.DataFrame,
+                   done: Mapping[int, bool],
+                   limits: tuple[tuple[int, tuple[int, int]], ...]) -> dict[int, Projection]:
+    """
+    entry_id -> Projection for every lineup ((element, position), ...).
+    Points, minutes and fixture state are looked up for all picks at once.
+    """
+    flat = [(eid, pid, posn) for eid, picks in lineups.items() for pid, posn in picks]
+    if not flat:
+        return {}
+    pids = [pid for _, pid, _ in flat]
+
+    stats = live.frame(pids)
+    bonus = stats["bonus"].to_numpy()
+    prov = np.fromiter((prov_bonus.get(pid, b) for pid, b in zip(pids, bonus)), dtype=np.int64, count=len(pids))
+    points = stats["total_points"].to_numpy() - bonus + prov
+    info = players.reindex(pids)
+    etype = info["element_type"].fillna(0).astype(int).to_numpy()
+    team_done = info["team"].map(lambda tid: done.get(tid, True)).to_numpy(dtype=bool)
+    played = stats["minutes"].to_numpy() > 0
+    state = np.where(played, PLAYED, np.where(team_done, OUT, PENDING))
+
+    by_entry: dict[int, list[Pick]] = {}
+    for i, (eid, pid, posn) in enumerate(flat):
+        by_entry.setdefault(eid, []).append((pid, posn, int(etype[i]), int(points[i]), str(state[i])))
+    return {eid: project_entry(tuple(picks), limits) for eid, picks in by_entry.items()}
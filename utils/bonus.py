@@ -0,0 +1,95 @@
+# utils/bonus.py
+"""
+Provisional bonus across every fixture of a gameweek.
+
+BPS is grouped per fixture (fixture `stats` bps lists when the fixtures
+endpoint has them, else live BPS mapped through `explain` fixture ids or the
+player's team), then compute_bonus_for_fixture runs per fixture. Results are
+memoised on each fixture's (element, minutes, bps) tuple, so a refresh only
+re-ranks fixtures whose BPS actually moved.
+"""
+from functools import lru_cache
+
+from utils.helpers import compute_bonus_for_fixture
+from utils.live import LiveStats
+
+
+def _fixture_stat(fixture: dict, identifier: str) -> list[dict]:
+    for s in fixture.get("stats") or []:
+        if s.get("identifier") == identifier:
+            return (s.get("h") or []) + (s.get("a") or [])
+    return []
+
+
+def _bonus_confirmed(fixture: dict, live: LiveStats, players: list[int]) -> bool:
+    """Official bonus is in once the fixture lists it, or any of its players has live bonus."""
+    if _fixture_stat(fixture, "bonus"):
+        return True
+    return fixture.get("finished", False) and any(live.get(pid, "bonus") for pid in players)
+
+
+def _fixture_players(fixtures: list[dict], live: LiveStats,
+                     team_players: dict[int, list[int]]) -> dict[int, list[int]]:
+    """fixture_id -> element ids that can score BPS in it."""
+    out: dict[int, list[int]] = {}
+    by_team: dict[int, list[int]] = {}
+    for f in fixtures:
+        fid = f.get("id")
+        if fid is None:
+            continue
+        out[fid] = []
+        for side in ("team_h", "team_a"):
+            by_team.setdefault(f.get(side), []).append(fid)
+
+    for team_id, pids in team_players.items():
+        for pid in pids:
+            # explain is exact (handles double gameweeks); team is the fallback
+            for fid in live.fixtures.get(pid) or by_team.get(team_id, []):
+                if fid in out:
+                    out[fid].append(pid)
+    return out
+
+
+@lru_cache(maxsize=2048)
+def _fixture_bonus(bps_key: tuple[tuple[int, int, int], ...]) -> tuple[tuple[int, int], ...]:
+    players = [{"id": pid, "minutes": mins, "bps": bps} for pid, mins, bps in bps_key]
+    return tuple(sorted(compute_bonus_for_fixture(players).items()))
+
+
+def fixture_bps(fixture: dict, live: LiveStats, players: list[int]) -> tuple[tuple[int, int, int], ...]:
+    """(element, minutes, bps) for one fixture; per-fixture BPS from the fixture stats when listed."""
+    listed = {int(s["element"]): int(s.get("value", 0)) for s in _fixture_stat(fixture, "bps") if s.get("element")}
+    key = []
+    for pid in players:
+        bps = listed.get(pid)
+        if bps is None:
+            if len(live.fixtures.get(pid, ())) > 1:
+                continue  # double GW without per-fixture BPS: can't split the live total
+            bps = live.get(pid, "bps")
+        # listed in the fixture's BPS table => played in it, even if the live minutes lag
+        mins = live.get(pid, "minutes") or (1 if pid in listed else 0)
+        key.append((pid, mins, bps))
+    return tuple(sorted(key))
+
+
+def provisional_bonus(fixtures: list[dict], live: LiveStats,
+                      team_players: dict[int, list[int]]) -> dict[int, int]:
+    """
+    element_id -> bonus to score with (a `bonus_override`), for every player
+    in a started fixture whose official bonus hasn't been added yet. The value
+    is the confirmed live bonus (other fixtures of a double GW) plus the
+    provisional bonus from the pending fixtures. Players absent from the
+    result keep their official bonus.
+    """
+    overrides: dict[int, int] = {}
+    players_by_fixture = _fixture_players(fixtures, live, team_players)
+    for f in fixtures:
+        if not f.get("started"):
+            continue
+        players = players_by_fixture.get(f.get("id"), [])
+        if not players or _bonus_confirmed(f, live, players):
+            continue
+        bonus = dict(_fixture_bonus(fixture_bps(f, live, players)))
+        for pid in players:
+            overrides[pid] = overrides.get(pid, live.get(pid, "bonus")) + bonus.get(pid, 0)
+    return overrides
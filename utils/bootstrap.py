@@ -0,0 +1,108 @@
+# utils/bootstrap.py
+"""
+Shared read-only view of /bootstrap-static.
+
+Built once per payload version and handed to every session as the same
+object (st.cache_resource, see api.get_bootstrap_store), so a rerun reads the
+prebuilt lookups instead of unpickling a fresh copy of the whole payload.
+Everything is frozen (MappingProxyType / tuples): callers must not mutate it.
+
+`players` is the compact element model: one row per element with small int
+ids and categorical club/position columns, for bulk joins (`reindex(pids)`)
+instead of per-player dict lookups.
+"""
+import hashlib
+import json
+from types import MappingProxyType
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+
+_EMPTY: Mapping = MappingProxyType({})
+
+
+def _freeze(obj):
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+    return obj
+
+
+def _players_frame(elements: Mapping[int, Mapping], teams: Mapping[int, Mapping],
+                   positions: Mapping[int, str]) -> pd.DataFrame:
+    """
+    index element id; columns web_name, team (id), club / team_name (categorical),
+    element_type, position (categorical, in element_type order).
+    """
+    n = len(elements)
+    team = np.fromiter((p.get("team") or 0 for p in elements.values()), dtype=np.int16, count=n)
+    etype = np.fromiter((p.get("element_type") or 0 for p in elements.values()), dtype=np.int8, count=n)
+
+    def by_code(codes: np.ndarray, names: Mapping[int, str]) -> pd.Categorical:
+        # categories = the lookup's values, so every frame of a payload shares them
+        cats = list(dict.fromkeys(v for _, v in sorted(names.items()) if v))
+        return pd.Categorical([names.get(int(c)) or None for c in codes], categories=cats)
+
+    return pd.DataFrame({
+        "web_name": [p.get("web_name") or f"#{pid}" for pid, p in elements.items()],
+        "team": team,
+        "club": by_code(team, {tid: t.get("short_name") for tid, t in teams.items()}),
+        "team_name": by_code(team, {tid: t.get("name") for tid, t in teams.items()}),
+        "element_type": etype,
+        "position": by_code(etype, positions),
+    }, index=pd.Index(np.fromiter(elements, dtype=np.int64, count=n), name="element"))
+
+
+def payload_version(payload: dict) -> str:
+    return hashlib.blake2b(json.dumps(payload, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+
+class BootstrapStore:
+    __slots__ = ("version", "elements", "teams", "teams_by_short", "element_types",
+                 "positions", "team_players", "events", "players")
+
+    def __init__(self, payload: dict, version: str | None = None):
+        self.version = version or payload_version(payload)
+        elements = {int(p["id"]): _freeze(p) for p in payload.get("elements") or []}
+        teams = {int(t["id"]): _freeze(t) for t in payload.get("teams") or []}
+        etypes = {int(et["id"]): _freeze(et) for et in payload.get("element_types") or []}
+        team_players: dict[int, list[int]] = {}
+        for pid, p in elements.items():
+            team_players.setdefault(p.get("team"), []).append(pid)
+        events = payload.get("events") or {}
+        if isinstance(events, dict):  # draft shape: {"current": n, "data": [...]}
+            events = events.get("data") or []
+
+        self.elements: Mapping[int, Mapping] = MappingProxyType(elements)
+        self.teams: Mapping[int, Mapping] = MappingProxyType(teams)
+        self.teams_by_short: Mapping[str, Mapping] = MappingProxyType(
+            {t["short_name"]: t for t in teams.values() if t.get("short_name")})
+        self.element_types: Mapping[int, Mapping] = MappingProxyType(etypes)
+        self.positions: Mapping[int, str] = MappingProxyType(
+            {eid: et.get("singular_name_short", "") for eid, et in etypes.items()})
+        self.team_players: Mapping[int, tuple[int, ...]] = MappingProxyType(
+            {tid: tuple(pids) for tid, pids in team_players.items()})
+        self.events: tuple[Mapping, ...] = _freeze(list(events))
+        # shared by every session: select/reindex from it, never assign into it
+        self.players: pd.DataFrame = _players_frame(self.elements, self.teams, self.positions)
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    def element(self, pid: int) -> Mapping:
+        return self.elements.get(pid, _EMPTY)
+
+    def team(self, team_id: int | None) -> Mapping:
+        return self.teams.get(team_id, _EMPTY)
+
+    def position(self, pid: int) -> str:
+        """Position short name ("GKP"/"DEF"/"MID"/"FWD") of an element."""
+        return self.positions.get(self.element(pid).get("element_type"), "")
+
+    def event(self, event_id: int) -> Mapping:
+        for ev in self.events:
+            if ev.get("id") == event_id:
+                return ev
+        return _EMPTY
@@ -0,0 +1,245 @@
+# utils/client.py
+"""
+Shared HTTP client for the FPL endpoints.
+
+One pooled keep-alive `requests.Session` per process, so repeated calls to
+draft.premierleague.com reuse the same TCP/TLS connections instead of doing a
+fresh handshake per fetch.
+"""
+import asyncio
+import contextvars
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils import disk_cache, metrics
+
+CONCURRENCY = 8               # max in-flight requests per batch
+TIMEOUT = (3.05, 10)          # (connect, read) seconds
+POOL_CONNECTIONS = 4          # distinct hosts we keep pools for
+POOL_MAXSIZE = 16             # keep-alive connections per host
+MAX_IN_FLIGHT = POOL_MAXSIZE  # upstream requests in flight across the whole process
+RETRIES = Retry(
+    total=3,
+    connect=3,
+    read=2,
+    backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    respect_retry_after_header=True,
+)
+HEADERS = {
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "fpl-draft-streamlit",
+}
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+# every session, league and the warmer share these slots, so more viewers or
+# leagues queue for the pool instead of opening more upstream connections
+_in_flight = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+
+
+def get_session() -> requests.Session:
+    """Process-wide session; built lazily on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=POOL_MAXSIZE,
+                    max_retries=RETRIES,
+                )
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                s.headers.update(HEADERS)
+                _session = s
+    return _session
+
+
+# set inside `refreshing()`: fetches skip the fresh-on-disk shortcut and
+# record the URLs whose body actually changed
+_refresh_changed: contextvars.ContextVar[set | None] = contextvars.ContextVar("refresh_changed", default=None)
+
+
+@contextmanager
+def refreshing():
+    """
+    Force revalidation of every fetch made inside the block (used by the
+    background warmer). Yields the set of URLs that came back with a new body.
+    """
+    changed: set[str] = set()
+    token = _refresh_changed.set(changed)
+    try:
+        yield changed
+    finally:
+        _refresh_changed.reset(token)
+
+
+class _Flight:
+    """One upstream fetch in progress; waiters block on `done` and share `result`."""
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: tuple[bytes | None, object, bool] = (None, None, False)
+
+
+# url -> the fetch in flight for it: concurrent misses on one URL (every
+# viewer at kickoff, warmer vs page, racing batches) make one upstream request
+_flights: dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+
+
+def _single_flight(url: str, fetch) -> tuple[tuple[bytes | None, object, bool], bool]:
+    """(fetch() result, coalesced?): the first caller per URL runs `fetch`, the rest wait for it."""
+    with _flights_lock:
+        flight = _flights.get(url)
+        leader = flight is None
+        if leader:
+            flight = _flights[url] = _Flight()
+    if not leader:
+        flight.done.wait()
+        return flight.result, True
+    try:
+        flight.result = fetch()
+    finally:
+        with _flights_lock:
+            del _flights[url]
+        flight.done.set()
+    return flight.result, False
+
+
+def fetch_json(url: str, default, ttl: float = 0, immutable: bool = False):
+    """
+    GET `url` through the shared session, backed by the on-disk cache.
+    `ttl`: seconds a stored body is served without revalidating.
+    `immutable`: keep the body forever (finished gameweeks).
+    Concurrent callers for the same URL share one upstream request.
+    Returns `default` on any failure.
+    """
+    refresh = _refresh_changed.get()
+    name = "http." + metrics.endpoint(url)
+    t0 = time.perf_counter()
+    cached = disk_cache.get(url)
+    if cached is not None and cached.is_fresh() and (refresh is None or cached.immutable):
+        try:
+            data = json.loads(cached.body)
+            metrics.record(name, time.perf_counter() - t0, hit=True)
+            return data
+        except ValueError:
+            cached = None
+
+    (body, data, changed), coalesced = _single_flight(url, lambda: _fetch(url, cached, ttl, immutable))
+    if refresh is not None and changed:
+        refresh.add(url)
+    if not coalesced:
+        return default if body is None else data
+    # served by another caller's request: each waiter parses its own copy
+    metrics.record(name, time.perf_counter() - t0, hit=body is not None, error=body is None)
+    return default if body is None else json.loads(body)
+
+
+def _fetch(url: str, cached, ttl: float, immutable: bool) -> tuple[bytes | None, object, bool]:
+    """
+    One upstream GET (conditional when `cached`), stored to disk.
+    Returns (body, parsed body, changed); on failure the stale cached body if
+    there is one, else body None.
+    """
+    name = "http." + metrics.endpoint(url)
+    t0 = time.perf_counter()
+    headers = {}
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+    r = None
+    try:
+        with _in_flight:
+            r = get_session().get(url, timeout=TIMEOUT, headers=headers)
+        if r.status_code == 304 and cached is not None:
+            disk_cache.touch(url, ttl, immutable)
+            metrics.record(name, time.perf_counter() - t0, hit=True, retries=_retries(r))
+            return cached.body, json.loads(cached.body), False
+        r.raise_for_status()
+        data = r.json()
+    except Exception:
+        metrics.record(name, time.perf_counter() - t0, hit=False, retries=_retries(r), error=True)
+        if cached is not None:
+            # upstream down: the expired body beats a blank page (not a change)
+            try:
+                return cached.body, json.loads(cached.body), False
+            except ValueError:
+                pass
+        return None, None, False
+
+    disk_cache.put(
+        url, r.content, ttl, immutable,
+        etag=r.headers.get("ETag"),
+        last_modified=r.headers.get("Last-Modified"),
+    )
+    metrics.record(name, time.perf_counter() - t0, hit=False, nbytes=len(r.content), retries=_retries(r))
+    return r.content, data, cached is None or cached.body != r.content
+
+
+def _retries(r) -> int:
+    """Retries urllib3 made before this response (0 if unknown)."""
+    retries = getattr(getattr(r, "raw", None), "retries", None)
+    return len(getattr(retries, "history", None) or ())
+
+
+# --- Batched fetches (asyncio) --- #
+
+# requests is blocking: every batch runs its calls on these long-lived
+# threads instead of a fresh default executor per asyncio.run
+_executor = ThreadPoolExecutor(max_workers=CONCURRENCY, thread_name_prefix="fpl-fetch")
+
+
+async def _fetch_all(urls: list[str], default, limit: int, ttl: float, immutable: bool) -> list:
+    sem = asyncio.Semaphore(max(1, limit))
+    loop = asyncio.get_running_loop()
+
+    async def one(url: str):
+        async with sem:
+            # carry the context over (refreshing() records changed URLs through it)
+            ctx = contextvars.copy_context()
+            return await loop.run_in_executor(_executor, ctx.run, fetch_json, url, default, ttl, immutable)
+
+    return await asyncio.gather(*(one(u) for u in urls))
+
+
+def _run(coro):
+    """Run `coro` to completion from sync code (Streamlit script threads have no loop)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # already inside a loop: drive the batch on a helper thread instead
+    box = {}
+    ctx = contextvars.copy_context()
+    t = threading.Thread(target=lambda: box.setdefault("r", ctx.run(asyncio.run, coro)))
+    t.start()
+    t.join()
+    return box["r"]
+
+
+def fetch_many(urls: list[str], default, limit: int = CONCURRENCY,
+               ttl: float = 0, immutable: bool = False) -> list:
+    """
+    Fetch every URL concurrently (at most `limit` in flight) and return the
+    JSON bodies in the same order; failed URLs yield `default`.
+    """
+    if not urls:
+        return []
+    return _run(_fetch_all(list(urls), default, limit, ttl, immutable))
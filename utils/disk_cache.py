@@ -0,0 +1,110 @@
+# utils/disk_cache.py
+"""
+Persistent response cache (SQLite) underneath the in-memory st.cache_data layer.
+
+Survives restarts/deploys, so a cold process only re-downloads what changed:
+- fresh entries (younger than their TTL) are served without touching the network
+- stale entries are revalidated with If-None-Match / If-Modified-Since (304 = reuse body)
+- immutable entries (finished gameweeks) are never refetched
+"""
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+CACHE_DIR = os.environ.get("FPL_CACHE_DIR", ".cache")
+DB_PATH = os.path.join(CACHE_DIR, "responses.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url           TEXT PRIMARY KEY,
+    body          BLOB NOT NULL,
+    fetched_at    REAL NOT NULL,
+    expires_at    REAL,            -- NULL = immutable, keep forever
+    etag          TEXT,
+    last_modified TEXT
+)
+"""
+
+_local = threading.local()
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    url: str
+    body: bytes
+    fetched_at: float
+    expires_at: float | None
+    etag: str | None
+    last_modified: str | None
+
+    @property
+    def immutable(self) -> bool:
+        return self.expires_at is None
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        return self.immutable or (now or time.time()) < self.expires_at
+
+
+def _conn() -> sqlite3.Connection:
+    # sqlite connections aren't shareable across threads; keep one per thread
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(_SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def get(url: str) -> CachedResponse | None:
+    try:
+        row = _conn().execute(
+            "SELECT url, body, fetched_at, expires_at, etag, last_modified FROM responses WHERE url = ?",
+            (url,),
+        ).fetchone()
+    except sqlite3.Error:
+        return None
+    return CachedResponse(*row) if row else None
+
+
+def _expiry(ttl: float, immutable: bool, now: float) -> float | None:
+    return None if immutable else now + ttl
+
+
+def put(url: str, body: bytes, ttl: float, immutable: bool = False,
+        etag: str | None = None, last_modified: str | None = None) -> None:
+    now = time.time()
+    try:
+        with _conn() as c:
+            c.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (url, body, now, _expiry(ttl, immutable, now), etag, last_modified),
+            )
+    except sqlite3.Error:
+        pass
+
+
+def touch(url: str, ttl: float, immutable: bool = False) -> None:
+    """Mark an entry as revalidated (304) without rewriting its body."""
+    now = time.time()
+    try:
+        with _conn() as c:
+            c.execute(
+                "UPDATE responses SET fetched_at = ?, expires_at = ? WHERE url = ?",
+                (now, _expiry(ttl, immutable, now), url),
+            )
+    except sqlite3.Error:
+        pass
+
+
+def clear() -> None:
+    """Drop every stored response."""
+    try:
+        with _conn() as c:
+            c.execute("DELETE FROM responses")
+    except sqlite3.Error:
+        pass
@@ -1,5 +1,27 @@
+import os
+
+import numpy as np
 import pandas as pd
+import streamlit as st
+
+# the league served when no ?league=<id> is given
+DEFAULT_LEAGUE_ID = int(os.environ.get("FPL_LEAGUE_ID", 12260))
+
+def selected_league_id() -> int:
+    """
+    League for this session: ?league=<id> in the URL, else the one this
+    session last used, else DEFAULT_LEAGUE_ID. Written back to the URL so it
+    survives page switches and can be shared.
+    """
+    raw = st.query_params.get("league")
+    if raw is not None and str(raw).isdigit():
+        st.session_state["league_id"] = int(raw)
+    league_id = st.session_state.get("league_id", DEFAULT_LEAGUE_ID)
+    if raw != str(league_id):
+        st.query_params["league"] = str(league_id)
+    return league_id
 
+# fixed colours for the original league's teams
 TEAM_COLOURS = {
     "Ekitikekitike": "#ffadad",
     "ØdegaardiansOfTheGal": "#ffd6a5",
@@ -9,14 +31,88 @@ TEAM_COLOURS = {
     "DioufFeelLuckyPunk?": "#a0c4ff",
     "No Juan Eyed Bernabe": "#bdb2ff",
 }
+# handed out (in league entry order) to teams without a fixed colour
+PALETTE = [
+    "#ffadad", "#ffd6a5", "#fdffb6", "#caffbf", "#9bf6ff", "#a0c4ff", "#bdb2ff", "#ffc6ff",
+    "#d0f4de", "#e4c1f9", "#fcf6bd", "#a9def9", "#ffcfd2", "#b9fbc0", "#f1c0e8", "#cfbaf0",
+]
+
+def team_colours(league_entries) -> dict[str, str]:
+    """entry_name -> background colour for a league's entries (league details "league_entries")."""
+    entries = sorted((e for e in league_entries if e.get("entry_name")), key=lambda e: e.get("id") or 0)
+    taken = {TEAM_COLOURS[e["entry_name"]] for e in entries if e["entry_name"] in TEAM_COLOURS}
+    free = [c for c in PALETTE if c not in taken] or PALETTE
+    colours, i = {}, 0
+    for e in entries:
+        name = e["entry_name"]
+        if name in TEAM_COLOURS:
+            colours[name] = TEAM_COLOURS[name]
+        else:
+            colours[name] = free[i % len(free)]
+            i += 1
+    return colours
 
-def highlight_teams(df: pd.DataFrame):
+def highlight_teams(df: pd.DataFrame, colours: dict[str, str] | None = None):
+    colours = TEAM_COLOURS if colours is None else colours
     def _style(val):
-        colour = TEAM_COLOURS.get(str(val), "")
+        colour = colours.get(str(val), "")
         return f"background-color: {colour}" if colour else ""
     return df.style.applymap(_style)
 
 
+# --- live stat keys (shared by the live-stats store and the pages)
+
+# Short labels for stats
+STAT_LABELS = {
+    "minutes": "min",
+    "goals_scored": "g",
+    "assists": "a",
+    "clean_sheets": "cs",
+    "goals_conceded": "gc",
+    "yellow_cards": "yc",
+    "red_cards": "rc",
+    "saves": "saves",
+    "bonus": "b",
+    "bps": "bps",
+    "defensive_contribution": "def",
+    "penalties_saved": "ps",
+    "penalties_missed": "pm",
+    "own_goals": "og",
+}
+
+# Useful display order (minutes first)
+STAT_ORDER = [
+    "minutes", "goals_scored", "assists", "clean_sheets", "goals_conceded",
+    "yellow_cards", "red_cards", "saves", "bonus", "bps",
+    "defensive_contribution", "penalties_saved", "penalties_missed", "own_goals",
+]
+
+# stats shown in the contrib strings; the "always" ones show even when 0
+_CONTRIB_ALWAYS = ("minutes", "bps", "defensive_contribution")
+_CONTRIB_KEYS = [
+    "minutes", "goals_scored", "assists", "clean_sheets", "goals_conceded",
+    "yellow_cards", "red_cards", "saves", "bonus", "bps", "defensive_contribution",
+]
+
+def format_contribs(stats: dict) -> str:
+    """e.g. "min+90 g+1 a+1 bps+32 def+4"; "—" for a player with no stats."""
+    contribs = []
+    for k in _CONTRIB_KEYS:
+        if (k in stats) if k in _CONTRIB_ALWAYS else stats.get(k):
+            contribs.append(f"{STAT_LABELS[k]}+{stats[k]}")
+    return " ".join(contribs) if contribs else "—"
+
+def format_contribs_many(stats: pd.DataFrame, present=None) -> list[str]:
+    """format_contribs for every row of a stats frame; rows with present=False give "—"."""
+    cols = [(STAT_LABELS[k], k in _CONTRIB_ALWAYS, stats[k].tolist()) for k in _CONTRIB_KEYS if k in stats]
+    present = [True] * len(stats) if present is None else present
+    out = []
+    for i, ok in enumerate(present):
+        parts = [f"{label}+{values[i]}" for label, always, values in cols if ok and (always or values[i])]
+        out.append(" ".join(parts) if parts else "—")
+    return out
+
+
 # --- scoring rules
 SCORING = {
     'long_play_limit': 60, 'short_play': 1, 'long_play': 2,
@@ -38,32 +134,22 @@ SCORING = {
 
 def compute_bonus_for_fixture(players: list[dict]) -> dict[int, int]:
     """
-    Given a list of players in one fixture with {"id": int, "bps": int},
-    return {player_id: bonus_points}.
-    Tie handling: all tied players take the higher bonus slot,
-    and lower slots are skipped.
+    Given a list of players in one fixture with {"id": int, "bps": int}
+    (and optionally "minutes"), return {player_id: bonus_points}.
+    Official tie handling: a player's bonus is set by their rank, where rank
+    is 1 + the number of players with strictly more BPS. So a tie for 1st
+    gives 3, 3, 1; a tie for 2nd gives 3, 2, 2; a tie for 3rd gives 3, 2, 1, 1.
+    Players who didn't play (minutes == 0) get nothing.
     """
-    # sort descending by BPS
-    players_sorted = sorted(players, key=lambda p: p.get("bps", 0), reverse=True)
+    played = [p for p in players if p.get("minutes", 1) > 0]
+    bps_sorted = sorted((p.get("bps", 0) for p in played), reverse=True)
 
-    # group by BPS value
-    from itertools import groupby
     bonus_map = {}
-    bonus_slots = [3, 2, 1]  # available bonus slots
-
-    i = 0
-    for bps_val, group in groupby(players_sorted, key=lambda p: p.get("bps", 0)):
-        group_list = list(group)
-        if i >= len(bonus_slots):
-            break
-        # everyone in this tie group gets the current slot value
-        slot_val = bonus_slots[i]
-        for g in group_list:
-            bonus_map[g["id"]] = slot_val
-        # if tie consumed a slot, skip as many slots as group size
-        # e.g. 2 players tied for top → both get 3, next slot to assign is "1"
-        i += len(group_list)
-
+    for p in played:
+        bps = p.get("bps", 0)
+        rank = 1 + sum(1 for b in bps_sorted if b > bps)
+        if rank <= 3:
+            bonus_map[p["id"]] = 4 - rank
     return bonus_map
 
 
@@ -112,3 +198,68 @@ def compute_score(stats: dict, pos: str, bonus_override: int | None = None) -> i
         pts += stats.get("bonus", 0) * SCORING['bonus']
 
     return pts
+
+
+# --- vectorised scoring (same rules as compute_score, one pass over all players)
+
+SCORE_STATS = [
+    "minutes", "goals_scored", "assists", "clean_sheets", "goals_conceded",
+    "saves", "defensive_contribution", "penalties_saved", "penalties_missed",
+    "yellow_cards", "red_cards", "own_goals", "bonus",
+]
+
+POSITIONS = ("GKP", "DEF", "MID", "FWD")
+_POS_CODE = {p: i for i, p in enumerate(POSITIONS)}  # anything else -> len(POSITIONS), an all-zero rule row
+
+def _rule(key: str) -> np.ndarray:
+    """SCORING[f"{key}_{pos}"] indexed by position code."""
+    return np.array([SCORING[f"{key}_{p}"] for p in POSITIONS] + [0], dtype=np.int64)
+
+def _column(stats: pd.DataFrame, key: str, n: int) -> np.ndarray:
+    if key not in stats.columns:
+        return np.zeros(n, dtype=np.int64)
+    values = stats[key].to_numpy()
+    if values.dtype.kind in "iu":  # LiveStats frames: already ints
+        return values.astype(np.int64, copy=False)
+    return pd.to_numeric(stats[key], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+
+def compute_scores(stats: pd.DataFrame, pos, bonus_override=None) -> np.ndarray:
+    """
+    Columnar compute_score: `stats` has one row per player and columns named
+    like the live `stats` keys (missing columns count as 0), `pos` is the
+    matching GKP/DEF/MID/FWD vector. `bonus_override` is an optional vector;
+    NaN/None entries fall back to the raw bonus. Returns an int array.
+    """
+    n = len(stats)
+    code = np.fromiter((_POS_CODE.get(p, len(POSITIONS)) for p in pos), dtype=np.intp, count=n)
+    col = {k: _column(stats, k, n) for k in SCORE_STATS}
+    minutes = col["minutes"]
+    long_play = minutes >= SCORING['long_play_limit']
+
+    pts = np.where(long_play, SCORING['long_play'], np.where(minutes > 0, SCORING['short_play'], 0))
+    pts = pts + col["goals_scored"] * _rule("goals_scored")[code]
+    pts += col["assists"] * SCORING['assists']
+    pts += np.where(long_play & (col["clean_sheets"] != 0), _rule("clean_sheets")[code], 0)
+
+    is_gk = code == _POS_CODE["GKP"]
+    concede_pos = is_gk | (code == _POS_CODE["DEF"])
+    pts += np.where(concede_pos,
+                    (col["goals_conceded"] // SCORING['concede_limit']) * _rule("goals_conceded")[code], 0)
+    pts += np.where(is_gk, (col["saves"] // SCORING['saves_limit']) * SCORING['saves'], 0)
+
+    dc_limit = _rule("defensive_contribution_limit")[code]
+    pts += np.where(dc_limit > 0,
+                    (col["defensive_contribution"] // np.maximum(dc_limit, 1)) * _rule("defensive_contribution")[code], 0)
+
+    pts += col["penalties_saved"] * SCORING['penalties_saved']
+    pts += col["penalties_missed"] * SCORING['penalties_missed']
+    pts += col["yellow_cards"] * SCORING['yellow_cards']
+    pts += col["red_cards"] * SCORING['red_cards']
+    pts += col["own_goals"] * SCORING['own_goals']
+
+    bonus = col["bonus"] * SCORING['bonus']
+    if bonus_override is not None:
+        override = np.array([np.nan if b is None else b for b in bonus_override], dtype=np.float64)
+        pending = ~np.isnan(override)
+        bonus = np.where(pending, np.nan_to_num(override).astype(np.int64), bonus)
+    return pts + bonus
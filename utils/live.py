@@ -0,0 +1,236 @@
+# utils/live.py
+"""
+Columnar store for /event/{gw}/live.
+
+The payload is parsed once into one int array per stat (STAT_ORDER + total_points)
+with an element id -> row index map, instead of every page building its own
+dict-of-dicts. LiveTracker diffs successive snapshots so in-play refreshes
+only rework the players whose stats moved.
+"""
+import hashlib
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from utils.helpers import STAT_ORDER, format_contribs
+
+LIVE_STATS = STAT_ORDER + ["total_points"]
+
+
+def _iter_live_elements(live: dict):
+    """Yield (element_id, element) for both payload shapes: {"82": {...}} or [{id, stats}]."""
+    live_elements = (live or {}).get("elements") or {}
+    if isinstance(live_elements, dict):
+        for k, v in live_elements.items():
+            try:
+                yield int(k), v or {}
+            except Exception:
+                continue
+    elif isinstance(live_elements, list):
+        for v in live_elements:
+            pid = (v or {}).get("id")
+            if pid is None:
+                continue
+            try:
+                yield int(pid), v
+            except Exception:
+                continue
+
+
+def _explain_fixtures(element: dict) -> tuple[int, ...]:
+    """
+    Fixture ids the element's points came from, for both `explain` shapes:
+    draft [[[{stat...}], fixture_id], ...] and classic [{"fixture": id, "stats": [...]}].
+    """
+    out = []
+    for item in element.get("explain") or []:
+        fid = None
+        if isinstance(item, dict):
+            fid = item.get("fixture")
+        elif isinstance(item, (list, tuple)) and len(item) >= 2:
+            fid = item[-1]
+        try:
+            out.append(int(fid))
+        except (TypeError, ValueError):
+            continue
+    return tuple(out)
+
+
+def _as_int(v) -> int:
+    try:
+        return int(v or 0)
+    except (TypeError, ValueError):
+        try:
+            return int(float(v))
+        except (TypeError, ValueError):
+            return 0
+
+
+class LiveStats:
+    """
+    ids:      element ids, one per row
+    index:    element id -> row
+    columns:  stat -> int64 array aligned with ids
+    fixtures: element id -> fixture ids from `explain` (absent if none listed)
+    """
+
+    __slots__ = ("ids", "index", "columns", "fixtures", "version")
+
+    def __init__(self, ids: np.ndarray, columns: dict[str, np.ndarray],
+                 fixtures: dict[int, tuple[int, ...]] | None = None):
+        self.ids = ids
+        self.index = {int(pid): i for i, pid in enumerate(ids)}
+        self.columns = columns
+        self.fixtures = fixtures or {}
+        # content digest: equal payloads -> equal version, whichever copy we hold
+        h = hashlib.blake2b(ids.tobytes(), digest_size=12)
+        for k in LIVE_STATS:
+            h.update(columns[k].tobytes())
+        self.version = h.hexdigest()
+
+    @classmethod
+    def from_payload(cls, live: dict) -> "LiveStats":
+        elements = list(_iter_live_elements(live))
+        parsed = [(pid, el.get("stats") or {}) for pid, el in elements]
+        ids = np.fromiter((pid for pid, _ in parsed), dtype=np.int64, count=len(parsed))
+        columns = {
+            k: np.fromiter((_as_int(s.get(k)) for _, s in parsed), dtype=np.int64, count=len(parsed))
+            for k in LIVE_STATS
+        }
+        fixtures = {}
+        for pid, el in elements:
+            fids = _explain_fixtures(el)
+            if fids:
+                fixtures[pid] = fids
+        return cls(ids, columns, fixtures)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, pid) -> bool:
+        return pid in self.index
+
+    def column(self, stat: str) -> np.ndarray:
+        return self.columns[stat]
+
+    def get(self, pid: int, stat: str, default: int = 0) -> int:
+        i = self.index.get(pid)
+        return default if i is None else int(self.columns[stat][i])
+
+    def row(self, pid: int) -> dict:
+        """stats dict for one element (same keys as the raw payload); {} if absent."""
+        i = self.index.get(pid)
+        if i is None:
+            return {}
+        return {k: int(col[i]) for k, col in self.columns.items()}
+
+    def frame(self, pids) -> pd.DataFrame:
+        """Stats for `pids` in the given order, one column per stat; 0 for absent elements."""
+        pids = list(pids)
+        rows = np.fromiter((self.index.get(pid, -1) for pid in pids), dtype=np.int64, count=len(pids))
+        present = rows >= 0
+        safe = np.where(present, rows, 0)
+        data = {
+            k: np.where(present, col[safe], 0) if len(col) else np.zeros(len(pids), dtype=np.int64)
+            for k, col in self.columns.items()
+        }
+        return pd.DataFrame(data, index=pd.Index(pids, name="element"))
+
+    def contribs(self, pid: int) -> str:
+        return format_contribs(self.row(pid))
+
+
+# --- Deltas between live snapshots --- #
+
+# stats worth a line in the "what just changed" feed (minutes and bps tick
+# constantly and would crowd out the goals and cards)
+FEED_STATS = [
+    "goals_scored", "assists", "own_goals", "penalties_saved", "penalties_missed",
+    "yellow_cards", "red_cards", "clean_sheets", "goals_conceded", "saves", "bonus",
+]
+
+
+@dataclass(frozen=True)
+class LiveDelta:
+    """
+    from_version/to_version: LiveStats versions compared
+    changed: element ids with any stat change (or new in the payload)
+    deltas:  element id -> {stat: change} for the stats that moved
+    """
+    from_version: str | None
+    to_version: str
+    changed: frozenset
+    deltas: dict = field(default_factory=dict)
+
+
+def diff_live_stats(prev: "LiveStats | None", curr: LiveStats) -> LiveDelta:
+    """Compare two snapshots column by column; only changed elements end up in the result."""
+    if prev is None:
+        return LiveDelta(None, curr.version, frozenset(int(pid) for pid in curr.ids))
+    if prev.version == curr.version:
+        return LiveDelta(prev.version, curr.version, frozenset())
+
+    old = prev.frame(curr.ids.tolist())
+    new_rows = np.fromiter((int(pid) not in prev.index for pid in curr.ids), dtype=bool, count=len(curr))
+    diffs = {k: curr.columns[k] - old[k].to_numpy() for k in LIVE_STATS}
+    moved = np.zeros(len(curr), dtype=bool)
+    for d in diffs.values():
+        moved |= d != 0
+    moved |= new_rows
+
+    deltas = {}
+    for i in np.flatnonzero(moved):
+        pid = int(curr.ids[i])
+        deltas[pid] = {k: int(d[i]) for k, d in diffs.items() if d[i] != 0}
+    return LiveDelta(prev.version, curr.version, frozenset(deltas), deltas)
+
+
+class LiveTracker:
+    """
+    Keeps the previous live snapshot for one GW, the recent deltas (so a
+    viewer can ask what changed since the version it last rendered), and a
+    rolling "what just changed" feed. Shared by all sessions; thread-safe.
+    """
+
+    def __init__(self, history: int = 30, feed_size: int = 50):
+        self._lock = threading.Lock()
+        self._last: LiveStats | None = None
+        self._history: deque[LiveDelta] = deque(maxlen=history)
+        self.feed: deque[dict] = deque(maxlen=feed_size)
+
+    def update(self, live: LiveStats) -> LiveDelta | None:
+        """Record a new snapshot; no-op (None) when the payload hasn't changed."""
+        with self._lock:
+            if self._last is not None and self._last.version == live.version:
+                return None
+            delta = diff_live_stats(self._last, live)
+            if self._last is not None:
+                now = time.time()
+                for pid, d in delta.deltas.items():
+                    for stat in FEED_STATS:
+                        if d.get(stat):
+                            self.feed.appendleft({"time": now, "element": pid, "stat": stat, "delta": d[stat]})
+            self._history.append(delta)
+            self._last = live
+            return delta
+
+    def changed_since(self, version: str | None) -> frozenset | None:
+        """
+        Element ids changed after `version` up to the latest snapshot;
+        None if `version` is unknown (too old / first view): recompute everything.
+        """
+        with self._lock:
+            if version is None:
+                return None
+            if self._last is not None and version == self._last.version:
+                return frozenset()
+            changed: set[int] = set()
+            for delta in reversed(self._history):
+                changed |= delta.changed
+                if delta.from_version == version:
+                    return frozenset(changed)
+            return None
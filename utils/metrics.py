@@ -0,0 +1,305 @@
+# utils/metrics.py
+"""
+Timing and cache metrics for the fetchers and the hot data-building stages.
+
+Everything is recorded twice: into process-wide totals (latency histograms,
+hit/miss counts, payload bytes, retries, errors per name) and into the current
+rerun, so the "Dev: diagnostics" expanders can show where this render's time
+went. Names are "api.<fetcher>", "http.<endpoint>" or "stage.<stage>".
+
+Export:
+- FPL_METRICS_PORT=9109  serves Prometheus text on /metrics (and JSON on /metrics.json)
+- FPL_METRICS_LOG=path   appends one JSON line per page rerun
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import streamlit as st
+
+log = logging.getLogger(__name__)
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+METRICS_PORT = os.environ.get("FPL_METRICS_PORT")
+METRICS_LOG = os.environ.get("FPL_METRICS_LOG")
+
+
+class Stat:
+    """Counters for one name (a fetcher, an endpoint or a stage)."""
+    __slots__ = ("calls", "seconds", "buckets", "hits", "misses", "bytes", "retries", "errors")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self.retries = 0
+        self.errors = 0
+
+    def observe(self, seconds: float | None = None, hit: bool | None = None,
+                nbytes: int = 0, retries: int = 0, error: bool = False) -> None:
+        if seconds is not None:
+            self.calls += 1
+            self.seconds += seconds
+            for i, le in enumerate(BUCKETS):
+                if seconds <= le:
+                    self.buckets[i] += 1
+                    break
+        if hit is not None:
+            self.hits += hit
+            self.misses += not hit
+        self.bytes += nbytes
+        self.retries += retries
+        self.errors += error
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the histogram bucket holding the q-quantile."""
+        if not self.calls:
+            return 0.0
+        rank, seen = q * self.calls, 0
+        for le, n in zip(BUCKETS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return le if le != float("inf") else self.seconds / self.calls
+        return BUCKETS[-2]
+
+    def as_dict(self) -> dict:
+        out = {"calls": self.calls, "seconds": round(self.seconds, 6)}
+        if self.hits or self.misses:
+            out.update(hits=self.hits, misses=self.misses)
+        for k in ("bytes", "retries", "errors"):
+            if getattr(self, k):
+                out[k] = getattr(self, k)
+        return out
+
+
+_lock = threading.Lock()
+_totals: dict[str, Stat] = {}
+# per-rerun stats; copied into fetch_many worker threads with the context
+_rerun: contextvars.ContextVar[dict[str, Stat] | None] = contextvars.ContextVar("metrics_rerun", default=None)
+_local = threading.local()
+
+
+def record(name: str, seconds: float | None = None, hit: bool | None = None,
+           nbytes: int = 0, retries: int = 0, error: bool = False) -> None:
+    run = _rerun.get()
+    with _lock:
+        for stats in (_totals, run) if run is not None else (_totals,):
+            stat = stats.get(name)
+            if stat is None:
+                stat = stats[name] = Stat()
+            stat.observe(seconds, hit, nbytes, retries, error)
+
+
+@contextmanager
+def timer(name: str):
+    """Time the block under `name` (e.g. "stage.live.rows")."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - t0)
+
+
+def timed(name: str):
+    """Decorator form of `timer`."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def endpoint(url: str) -> str:
+    """"https://draft.../api/entry/177491/event/5" -> "draft/entry/{id}/event/{id}" (bounded label set)."""
+    host = "fpl" if "fantasy" in url or "/fpl/" in url else "draft"
+    path = re.sub(r"^.*?/api", "", url.split("?", 1)[0])
+    return host + re.sub(r"/\d+", "/{id}", path)
+
+
+# --- Instrumented st caches --- #
+
+def _instrumented(cache, name: str | None, kwargs: dict):
+    def deco(fn):
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def compute(*args, **kw):
+            _local.missed = True  # only reached when the cache missed
+            return fn(*args, **kw)
+
+        cached = cache(**kwargs)(compute) if kwargs else cache(compute)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kw):
+            outer = getattr(_local, "missed", False)
+            _local.missed = False
+            t0 = time.perf_counter()
+            try:
+                return cached(*args, **kw)
+            finally:
+                record(label, time.perf_counter() - t0, hit=not _local.missed)
+                _local.missed = outer
+
+        wrapper.clear = cached.clear
+        return wrapper
+    return deco
+
+
+def cache_data(fn=None, *, name: str | None = None, **kwargs):
+    """`st.cache_data` that also records latency and hit/miss under "api.<fn>"."""
+    deco = _instrumented(st.cache_data, name, kwargs)
+    return deco(fn) if fn is not None else deco
+
+
+def cache_resource(fn=None, *, name: str | None = None, **kwargs):
+    """`st.cache_resource` that also records latency and hit/miss under "api.<fn>"."""
+    deco = _instrumented(st.cache_resource, name, kwargs)
+    return deco(fn) if fn is not None else deco
+
+
+# --- Per rerun --- #
+
+def start_rerun(page: str) -> None:
+    """Begin collecting this rerun's metrics (call at the top of a page)."""
+    _rerun.set({})
+    _local.page = page
+    _local.started = time.perf_counter()
+    _exporter()
+
+
+def rerun_stats() -> dict[str, Stat]:
+    run = _rerun.get()
+    with _lock:
+        return dict(run or {})
+
+
+def log_rerun() -> None:
+    """Append this rerun's metrics to FPL_METRICS_LOG (one JSON object per line)."""
+    if not METRICS_LOG:
+        return
+    line = {
+        "time": time.time(),
+        "page": getattr(_local, "page", ""),
+        "seconds": round(time.perf_counter() - getattr(_local, "started", time.perf_counter()), 6),
+        "metrics": {k: v.as_dict() for k, v in rerun_stats().items()},
+    }
+    with _lock, open(METRICS_LOG, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps(line) + "\n")
+
+
+def _frame(stats: dict[str, Stat], quantiles: bool) -> pd.DataFrame:
+    rows = []
+    for k, s in sorted(stats.items(), key=lambda kv: -kv[1].seconds):
+        row = {"name": k, "calls": s.calls, "total ms": round(s.seconds * 1000, 1),
+               "hit %": round(100 * s.hits / (s.hits + s.misses)) if s.hits + s.misses else None,
+               "KB": round(s.bytes / 1024, 1), "retries": s.retries, "errors": s.errors}
+        if quantiles:
+            row["p50 ms"] = round(s.quantile(0.5) * 1000, 1)
+            row["p95 ms"] = round(s.quantile(0.95) * 1000, 1)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def rerun_frame() -> pd.DataFrame:
+    """This rerun's metrics as a table, slowest first."""
+    return _frame(rerun_stats(), quantiles=False)
+
+
+def totals_frame() -> pd.DataFrame:
+    """Process-wide metrics as a table, with p50/p95 from the histograms."""
+    with _lock:
+        stats = dict(_totals)
+    return _frame(stats, quantiles=True)
+
+
+# --- Export --- #
+
+def snapshot() -> dict:
+    with _lock:
+        return {k: {**v.as_dict(), "buckets": list(v.buckets)} for k, v in _totals.items()}
+
+
+def prometheus() -> str:
+    """Process-wide totals in the Prometheus text exposition format."""
+    with _lock:
+        stats = sorted(_totals.items())
+        lines = [
+            "# HELP fpl_seconds Time spent per fetcher, endpoint or stage.",
+            "# TYPE fpl_seconds histogram",
+        ]
+        for name, s in stats:
+            cum = 0
+            for le, n in zip(BUCKETS, s.buckets):
+                cum += n
+                le_s = "+Inf" if le == float("inf") else repr(le)
+                lines.append(f'fpl_seconds_bucket{{name="{name}",le="{le_s}"}} {cum}')
+            lines.append(f'fpl_seconds_sum{{name="{name}"}} {s.seconds:.6f}')
+            lines.append(f'fpl_seconds_count{{name="{name}"}} {s.calls}')
+        for metric, help_, attr in (
+            ("fpl_cache_hits_total", "Cache hits.", "hits"),
+            ("fpl_cache_misses_total", "Cache misses.", "misses"),
+            ("fpl_payload_bytes_total", "Response bytes downloaded.", "bytes"),
+            ("fpl_retries_total", "HTTP retries.", "retries"),
+            ("fpl_errors_total", "Failed fetches.", "errors"),
+        ):
+            lines += [f"# HELP {metric} {help_}", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{name="{name}"}} {getattr(s, attr)}' for name, s in stats]
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body, ctype = json.dumps(snapshot()).encode(), "application/json"
+        elif self.path.startswith("/metrics"):
+            body, ctype = prometheus().encode(), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@st.cache_resource
+def _exporter() -> ThreadingHTTPServer | None:
+    """Prometheus endpoint on FPL_METRICS_PORT (once per process; off when unset)."""
+    if not METRICS_PORT:
+        return None
+    try:
+        server = ThreadingHTTPServer(("0.0.0.0", int(METRICS_PORT)), _Handler)
+    except (OSError, ValueError):
+        # port taken (another instance) or not a port: renders must not depend on the exporter
+        log.warning("metrics exporter not started on FPL_METRICS_PORT=%s", METRICS_PORT, exc_info=True)
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True).start()
+    return server
+
+
+def diagnostics() -> None:
+    """Render this rerun's metrics (and the process totals) inside a diagnostics expander."""
+    st.caption("This rerun")
+    st.dataframe(rerun_frame(), hide_index=True, use_container_width=True)
+    if st.checkbox("Process totals", key="metrics_totals"):
+        st.dataframe(totals_frame(), hide_index=True, use_container_width=True)
+        st.download_button("Prometheus text", prometheus(), file_name="fpl_metrics.txt")
+    log_rerun()
@@ -0,0 +1,99 @@
+# utils/standings.py
+"""
+Live league table: the finalised standings plus the projected result of every
+unfinished H2H match of the current event.
+
+One LiveStandings per league is shared by all sessions (st.cache_resource).
+It remembers the projected scores each match was applied with, so an update
+only reworks the two rows of a match whose projection moved; the official
+standings are only re-read when the league itself changes (GW processed).
+"""
+import threading
+from typing import Mapping
+
+WIN, DRAW = 3, 1
+
+_COUNTED = ("total", "points_for", "matches_won", "matches_drawn", "matches_lost")
+
+
+def _match_key(m: dict) -> tuple[int, int, int]:
+    return m.get("event"), m.get("league_entry_1"), m.get("league_entry_2")
+
+
+class LiveStandings:
+    """
+    table:   rows sorted by live rank; each has league_entry, rank, last_rank
+             (official rank), movement (+ = up), gw (projected score or None)
+             and the standings counters (total, points_for, matches_won/drawn/lost)
+    version: bumped whenever the table changes
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._base_key: tuple | None = None
+        self._rows: dict[int, dict] = {}
+        self._applied: dict[tuple, tuple[int, int, int, int]] = {}
+        self.table: tuple[dict, ...] = ()
+        self.version = 0
+
+    def _apply(self, match: tuple[int, int, int, int], sign: int) -> None:
+        e1, e2, p1, p2 = match
+        for own, other, entry in ((p1, p2, e1), (p2, p1, e2)):
+            row = self._rows.get(entry)
+            if row is None:
+                continue
+            won, drawn = own > other, own == other
+            row["points_for"] += sign * own
+            row["matches_won"] += sign * won
+            row["matches_drawn"] += sign * drawn
+            row["matches_lost"] += sign * (not won and not drawn)
+            row["total"] += sign * (WIN * won + DRAW * drawn)
+            row["gw"] = own if sign > 0 else None
+
+    def _rank(self) -> None:
+        ordered = sorted(self._rows.values(), key=lambda r: (-r["total"], -r["points_for"], r["last_rank"]))
+        for i, row in enumerate(ordered, 1):
+            row["rank"] = i
+            row["movement"] = row["last_rank"] - i
+        self.table = tuple(dict(r) for r in ordered)
+        self.version += 1
+
+    def update(self, standings: list[dict], matches: list[dict],
+               projected: Mapping[int, int]) -> tuple[dict, ...]:
+        """
+        standings: league details `standings` (official, processed GWs only)
+        matches:   the current event's matches
+        projected: league_entry id -> projected GW score
+        """
+        with self._lock:
+            base_key = tuple((s.get("league_entry"), *(s.get(k, 0) for k in _COUNTED)) for s in standings)
+            dirty = base_key != self._base_key
+            if dirty:
+                self._base_key, self._applied = base_key, {}
+                self._rows = {}
+                for i, s in enumerate(standings, 1):
+                    row = {k: s.get(k, 0) or 0 for k in _COUNTED}
+                    row.update(league_entry=s.get("league_entry"), last_rank=s.get("rank") or i, gw=None)
+                    self._rows[row["league_entry"]] = row
+
+            live = {}
+            for m in matches:
+                e1, e2 = m.get("league_entry_1"), m.get("league_entry_2")
+                if m.get("finished") or e1 not in projected or e2 not in projected:
+                    continue  # finished matches are already in the standings
+                live[_match_key(m)] = (e1, e2, projected[e1], projected[e2])
+
+            for key in self._applied.keys() | live.keys():
+                old, new = self._applied.get(key), live.get(key)
+                if old == new:
+                    continue
+                if old:
+                    self._apply(old, -1)
+                if new:
+                    self._apply(new, +1)
+                dirty = True
+            self._applied = live
+
+            if dirty:
+                self._rank()
+            return self.table
@@ -0,0 +1,146 @@
+# utils/swr.py
+"""
+Stale-while-revalidate cache for the upstream fetchers.
+
+With st.cache_data(ttl=...) whichever viewer hits an expired entry waits for
+the upstream call, which is exactly when the FPL API is slowest (deadlines,
+goals). `swr_cache` instead:
+
+- serves a fresh entry from memory;
+- serves an expired entry immediately and refreshes it on a background
+  thread (at most one refresh per entry at a time);
+- keeps the last good value when a fetch fails (the fetcher raises
+  UpstreamError), so an upstream blip doesn't blank the page. With nothing
+  cached yet the caller gets the error's `partial` value, else `default`.
+
+Values are stored pickled and unpickled per call, like st.cache_data, so a
+caller can't mutate the shared copy; `shared=True` keeps the object itself
+and hands every caller the same one, like st.cache_resource (for frozen
+values such as the BootstrapStore). `clear(*args)` invalidates: the next
+call recomputes synchronously (the warmer clears after refreshing the disk
+cache, so that's a disk read) and still falls back to the old value on error.
+"""
+import copy
+import functools
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from utils import metrics
+
+log = logging.getLogger(__name__)
+
+
+class UpstreamError(Exception):
+    """A fetch failed. `partial`: what could be built anyway, used only if nothing is cached."""
+
+    def __init__(self, what: str, partial=None):
+        super().__init__(what)
+        self.partial = partial
+
+
+class _Entry:
+    __slots__ = ("stored", "fetched", "valid", "refreshing")
+
+    def __init__(self, stored):
+        self.stored = stored
+        self.fetched = time.monotonic()
+        self.valid = True
+        self.refreshing = False
+
+
+_caches: list = []  # every swr_cache, for clear_all()
+
+
+def swr_cache(fn=None, *, ttl: float, default=None, max_entries: int | None = None,
+              shared: bool = False, name: str | None = None):
+    """Stale-while-revalidate memo for `fn`; latency and hit/miss recorded under "api.<fn>"."""
+    def deco(fn):
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+        entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        lock = threading.Lock()
+
+        def store(key: tuple, value) -> None:
+            stored = value if shared else pickle.dumps(value)
+            with lock:
+                entries[key] = _Entry(stored)
+                entries.move_to_end(key)
+                while max_entries and len(entries) > max_entries:
+                    entries.popitem(last=False)
+
+        def load(entry: _Entry):
+            return entry.stored if shared else pickle.loads(entry.stored)
+
+        def revalidate(key: tuple, args: tuple, kwargs: dict) -> None:
+            t0 = time.perf_counter()
+            try:
+                store(key, fn(*args, **kwargs))
+                metrics.record(f"{label}.revalidate", time.perf_counter() - t0)
+            except Exception:
+                # the stale entry stays in place; the next expired read retries
+                log.warning("revalidating %s%s failed", label, args, exc_info=True)
+                metrics.record(f"{label}.revalidate", time.perf_counter() - t0, error=True)
+                with lock:
+                    entry = entries.get(key)
+                    if entry is not None:
+                        entry.refreshing = False
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            t0 = time.perf_counter()
+            with lock:
+                entry = entries.get(key)
+                if entry is not None:
+                    entries.move_to_end(key)
+                    expired = time.monotonic() - entry.fetched > ttl
+                    start = entry.valid and expired and not entry.refreshing
+                    if start:
+                        entry.refreshing = True
+            if entry is not None and entry.valid:
+                if start:
+                    threading.Thread(target=revalidate, args=(key, args, kwargs),
+                                     name=f"swr-{label}", daemon=True).start()
+                value = load(entry)
+                metrics.record(label, time.perf_counter() - t0, hit=True)
+                return value
+
+            try:
+                value = fn(*args, **kwargs)
+            except UpstreamError as e:
+                metrics.record(label, time.perf_counter() - t0, hit=False, error=True)
+                if entry is not None:
+                    return load(entry)  # invalidated, but still the last good value
+                return copy.deepcopy(default) if e.partial is None else e.partial
+            store(key, value)
+            metrics.record(label, time.perf_counter() - t0, hit=False)
+            return value
+
+        def clear(*args, **kwargs) -> None:
+            """Invalidate the entry for these arguments (all entries without arguments)."""
+            with lock:
+                if args or kwargs:
+                    targets = [entries.get((args, tuple(sorted(kwargs.items()))))]
+                else:
+                    targets = list(entries.values())
+                for entry in targets:
+                    if entry is not None:
+                        entry.valid = False
+
+        def drop() -> None:
+            with lock:
+                entries.clear()
+
+        wrapper.clear = clear
+        wrapper.drop = drop
+        _caches.append(wrapper)
+        return wrapper
+    return deco(fn) if fn is not None else deco
+
+
+def clear_all() -> None:
+    """Forget every entry of every swr_cache (tests/benchmarks switching datasets)."""
+    for cache in _caches:
+        cache.drop()
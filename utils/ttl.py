@@ -0,0 +1,75 @@
+# utils/ttl.py
+"""
+Cache TTL policy driven by fixture state.
+
+Poll hard only while a fixture is in play (or its bonus is still being
+processed) and back off to hours between gameweeks. Inputs are data we
+already load: fixture kickoff_time/started/finished flags and /game status.
+"""
+from datetime import datetime, timedelta, timezone
+
+# a match (plus stoppage/half-time) is over within this window of kickoff
+MATCH_WINDOW = timedelta(hours=2, minutes=15)
+PRE_KICKOFF = timedelta(hours=1)
+
+IN_PLAY = "in_play"
+PROCESSING = "processing"
+PRE_MATCH = "pre_kickoff"
+MATCHDAY = "matchday"
+IDLE = "idle"
+
+# seconds, per phase
+LIVE_TTL = {IN_PLAY: 20, PROCESSING: 120, PRE_MATCH: 300, MATCHDAY: 900, IDLE: 3 * 3600}
+FIXTURES_TTL = {IN_PLAY: 30, PROCESSING: 120, PRE_MATCH: 300, MATCHDAY: 900, IDLE: 6 * 3600}
+
+
+def _kickoff(f: dict) -> datetime | None:
+    ko = f.get("kickoff_time")
+    if not ko:
+        return None
+    try:
+        return datetime.fromisoformat(ko.replace("Z", "+00:00"))
+    except Exception:
+        return None
+
+
+def fixture_phase(fixtures: list[dict], status: dict | None = None, now: datetime | None = None) -> str:
+    """Most active phase across a GW's fixtures (in play > processing > pre-kickoff > matchday > idle)."""
+    now = now or datetime.now(timezone.utc)
+    in_play = processing = pre_match = matchday = False
+
+    for f in fixtures or []:
+        ko = _kickoff(f)
+        if f.get("finished"):
+            continue
+        if f.get("finished_provisional"):
+            processing = True  # full time, bonus not confirmed yet
+            continue
+        if f.get("started") or (ko and ko <= now < ko + MATCH_WINDOW):
+            in_play = True
+        elif ko and now < ko <= now + PRE_KICKOFF:
+            pre_match = True
+        elif ko and ko.date() == now.date():
+            matchday = True
+
+    status = status or {}
+    if status.get("processing_status") not in (None, "", "n"):
+        processing = True
+
+    if in_play:
+        return IN_PLAY
+    if processing:
+        return PROCESSING
+    if pre_match:
+        return PRE_MATCH
+    if matchday:
+        return MATCHDAY
+    return IDLE
+
+
+def live_ttl(fixtures: list[dict], status: dict | None = None) -> int:
+    return LIVE_TTL[fixture_phase(fixtures, status)]
+
+
+def fixtures_ttl(fixtures: list[dict], status: dict | None = None) -> int:
+    return FIXTURES_TTL[fixture_phase(fixtures, status)]
@@ -0,0 +1,228 @@
+# utils/warehouse.py
+"""
+Local season warehouse (SQLite) for history views: form, cumulative points,
+ownership over time.
+
+`backfill(league_id)` pulls /event/{gw}/live, the season fixtures and every
+entry's /entry/{id}/event/{gw} picks for all started gameweeks. It is
+incremental: a GW stored as finished is never fetched again, only new or
+still-running GWs are. Runs from the background warmer, or by hand:
+
+    python -m utils.warehouse --league 12260
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+from utils import api
+from utils.client import fetch_many
+from utils.disk_cache import CACHE_DIR
+from utils.live import LIVE_STATS, LiveStats
+
+DB_PATH = os.path.join(CACHE_DIR, "warehouse.sqlite3")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS gameweeks (
+    event      INTEGER PRIMARY KEY,
+    finished   INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS live_stats (
+    event   INTEGER NOT NULL,
+    element INTEGER NOT NULL,
+    {", ".join(f"{k} INTEGER NOT NULL" for k in LIVE_STATS)},
+    PRIMARY KEY (event, element)
+);
+CREATE TABLE IF NOT EXISTS fixtures (
+    id           INTEGER PRIMARY KEY,
+    event        INTEGER,
+    team_h       INTEGER,
+    team_a       INTEGER,
+    team_h_score INTEGER,
+    team_a_score INTEGER,
+    kickoff_time TEXT,
+    finished     INTEGER
+);
+CREATE TABLE IF NOT EXISTS league_gameweeks (
+    league_id  INTEGER NOT NULL,
+    event      INTEGER NOT NULL,
+    finished   INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (league_id, event)
+);
+CREATE TABLE IF NOT EXISTS picks (
+    league_id  INTEGER NOT NULL,
+    entry_id   INTEGER NOT NULL,
+    event      INTEGER NOT NULL,
+    element    INTEGER NOT NULL,
+    position   INTEGER,
+    multiplier INTEGER,
+    PRIMARY KEY (entry_id, event, element)
+);
+CREATE INDEX IF NOT EXISTS picks_league_event ON picks (league_id, event);
+"""
+
+_lock = threading.Lock()  # one backfill at a time per process
+
+
+@contextmanager
+def connect():
+    """Short-lived connection; commits on success, always closes."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _events():
+    return api.get_bootstrap_store().events
+
+
+def _pending(conn: sqlite3.Connection, started: list[int], finished: set[int],
+             table: str, where: str = "", args: tuple = ()) -> list[int]:
+    """Started GWs not yet stored as finished in `table`."""
+    done = {row[0] for row in conn.execute(
+        f"SELECT event FROM {table} WHERE finished = 1 {where}", args)}
+    return [e for e in started if not (e in done and e in finished)]
+
+
+def _fetch(urls: list[str], events: list[int], finished: set[int]) -> list:
+    """fetch_many, storing finished GWs as immutable in the response cache."""
+    bodies: list = [None] * len(urls)
+    for done in (True, False):
+        idx = [i for i, e in enumerate(events) if (e in finished) == done]
+        for i, body in zip(idx, fetch_many([urls[i] for i in idx], default=None, immutable=done)):
+            bodies[i] = body
+    return bodies
+
+
+def backfill(league_id: int) -> dict:
+    """Fetch only new / unfinished GWs into the warehouse. Returns counts of what was fetched."""
+    with _lock, connect() as conn:
+        status = api.get_game_status() or {}
+        current = status.get("current_event") or 0
+        started = [ev["id"] for ev in _events() if ev.get("id") and ev["id"] <= current]
+        # same rule as the fetchers: final (and cacheable forever) only once data_checked too
+        finished = {ev["id"] for ev in _events() if ev.get("id") and api._event_finished(ev["id"])}
+        now = time.time()
+
+        # --- live stats per GW (bounded concurrency)
+        live_events = _pending(conn, started, finished, "gameweeks")
+        bodies = _fetch([f"{api.DRAFT_BASE}/event/{e}/live" for e in live_events], live_events, finished)
+        for event, body in zip(live_events, bodies):
+            if body is None:
+                continue
+            live = LiveStats.from_payload(body)
+            conn.execute("DELETE FROM live_stats WHERE event = ?", (event,))
+            conn.executemany(
+                f"INSERT INTO live_stats VALUES (?, ?, {', '.join('?' for _ in LIVE_STATS)})",
+                [(event, int(pid), *(int(live.columns[k][i]) for k in LIVE_STATS))
+                 for i, pid in enumerate(live.ids)],
+            )
+            conn.execute("INSERT OR REPLACE INTO gameweeks VALUES (?, ?, ?)",
+                         (event, int(event in finished), now))
+
+        # --- fixtures (one season call, cheap to upsert)
+        if live_events:
+            conn.executemany(
+                "INSERT OR REPLACE INTO fixtures VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(f["id"], f.get("event"), f.get("team_h"), f.get("team_a"),
+                  f.get("team_h_score"), f.get("team_a_score"), f.get("kickoff_time"),
+                  int(bool(f.get("finished"))))
+                 for f in (api.get_season_fixtures() or []) if f.get("id") is not None],
+            )
+
+        # --- every entry's picks per GW
+        entries = sorted(api.league_entries_map(league_id))
+        if not entries:
+            # league details failed (or the league is empty): marking the GWs
+            # done now would leave them without picks for good
+            return {"live": len(live_events), "picks": 0}
+        pick_events = _pending(conn, started, finished, "league_gameweeks",
+                               "AND league_id = ?", (league_id,))
+        jobs = [(eid, e) for e in pick_events for eid in entries]
+        bodies = _fetch([f"{api.DRAFT_BASE}/entry/{eid}/event/{e}" for eid, e in jobs],
+                        [e for _, e in jobs], finished)
+        failed = set()
+        for (eid, event), body in zip(jobs, bodies):
+            if body is None:
+                failed.add(event)
+                continue
+            conn.execute("DELETE FROM picks WHERE entry_id = ? AND event = ?", (eid, event))
+            conn.executemany(
+                "INSERT OR REPLACE INTO picks VALUES (?, ?, ?, ?, ?, ?)",
+                [(league_id, eid, event, int(p["element"]), p.get("position"), p.get("multiplier"))
+                 for p in (body.get("picks") or []) if p.get("element") is not None],
+            )
+        for event in pick_events:
+            if event not in failed:
+                conn.execute("INSERT OR REPLACE INTO league_gameweeks VALUES (?, ?, ?, ?)",
+                             (league_id, event, int(event in finished), now))
+
+        return {"live": len(live_events), "picks": len(jobs)}
+
+
+# --- Queries for the pages --- #
+
+@st.cache_data(ttl=600)
+def player_history(upto_event: int) -> pd.DataFrame:
+    """One row per (event, element) up to and including `upto_event`."""
+    with connect() as conn:
+        return pd.read_sql_query(
+            "SELECT event, element, minutes, total_points FROM live_stats WHERE event <= ?",
+            conn, params=(upto_event,),
+        )
+
+
+@st.cache_data(ttl=600)
+def player_form(upto_event: int, last_n: int = 5) -> pd.DataFrame:
+    """
+    Per element: Form (avg points over the last `last_n` GWs before `upto_event`)
+    and Season (cumulative points before `upto_event`).
+    """
+    hist = player_history(upto_event - 1)
+    if hist.empty:
+        return pd.DataFrame({"Form": pd.Series(dtype="float64"), "Season": pd.Series(dtype="int64")},
+                            index=pd.Index([], dtype="int64", name="element"))
+    recent = hist[hist["event"] > upto_event - 1 - last_n]
+    # early in the season the window holds fewer than last_n GWs
+    window = max(1, recent["event"].nunique())
+    out = pd.DataFrame({
+        "Form": recent.groupby("element")["total_points"].sum() / window,
+        "Season": hist.groupby("element")["total_points"].sum(),
+    })
+    return out.fillna({"Form": 0.0, "Season": 0}).round({"Form": 1})
+
+
+@st.cache_data(ttl=600)
+def ownership_history(league_id: int) -> pd.DataFrame:
+    """(event, entry_id, element, position) for every stored GW of the league."""
+    with connect() as conn:
+        return pd.read_sql_query(
+            "SELECT event, entry_id, element, position FROM picks WHERE league_id = ? ORDER BY event",
+            conn, params=(league_id,),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill the local season warehouse.")
+    parser.add_argument("--league", type=int, action="append", required=True,
+                        help="league id to backfill picks for (repeatable)")
+    args = parser.parse_args()
+    for league_id in args.league:
+        print(league_id, backfill(league_id))
+
+
+if __name__ == "__main__":
+    main()
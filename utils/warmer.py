@@ -0,0 +1,206 @@
+# utils/warmer.py
+"""
+Background cache warmer.
+
+Refreshes game status, live stats, fixtures, league details and picks on a
+schedule tied to fixture state (and tops up the season warehouse hourly), writing into the on-disk cache and dropping
+the matching st.cache_data entries when something changed, so page renders
+read warm data instead of waiting on the FPL API.
+
+Runs as a daemon thread inside the app (see `start_warmer`, disable with
+FPL_WARMER=0) or as a standalone worker sharing the same FPL_CACHE_DIR:
+
+    python -m utils.warmer --league 12260
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import streamlit as st
+
+from utils import api, warehouse
+from utils.client import refreshing
+from utils.swr import UpstreamError
+from utils.ttl import IN_PLAY, fixture_phase
+
+log = logging.getLogger(__name__)
+
+TICK = 5  # seconds between schedule checks
+LEAGUE_IDLE = 1800  # stop warming a league nobody has viewed for this long
+
+# refresh intervals (seconds): (while a fixture is in play, otherwise);
+# None = follow the adaptive TTL policy for that endpoint (utils/ttl.py)
+INTERVALS = {
+    "game":       (60, 300),
+    "bootstrap":  (300, 3600),
+    "fixtures":   None,
+    "live":       None,
+    "league":     (120, 600),
+    "ownership":  (60, 600),
+    "picks":      (120, 900),
+    "warehouse":  (3600, 3600),
+}
+
+
+@dataclass
+class _Job:
+    name: str
+    last_run: float = 0.0
+
+
+class Warmer:
+    def __init__(self, league_ids=(), clear_memory: bool = True):
+        self.league_ids: set[int] = set(league_ids)  # pinned (CLI); never go idle
+        # league -> last page view (in-app), least recently viewed first
+        self._seen: OrderedDict[int, float] = OrderedDict()
+        self.clear_memory = clear_memory  # False in a separate worker: no in-process caches to drop
+        self._jobs: dict[str, _Job] = {name: _Job(name) for name in INTERVALS}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add_league(self, league_id: int) -> None:
+        """Called on every page view: (re)start warming `league_id`."""
+        with self._lock:
+            if league_id not in self.league_ids and league_id not in self._seen:
+                # new league: warm its data on the next tick
+                for name in ("league", "ownership", "picks"):
+                    self._jobs[name].last_run = 0.0
+            self._seen[league_id] = time.time()
+            self._seen.move_to_end(league_id)
+            # each league costs a picks backfill plus recurring jobs: keep as
+            # many as the in-memory caches hold, dropping the least recently viewed
+            while len(self._seen) > api.MAX_LEAGUES:
+                self._seen.popitem(last=False)
+
+    def _leagues(self, now: float) -> list[int]:
+        """Pinned leagues plus those viewed within LEAGUE_IDLE."""
+        with self._lock:
+            for lid in [lid for lid, seen in self._seen.items() if now - seen > LEAGUE_IDLE]:
+                del self._seen[lid]
+            return sorted(self.league_ids | set(self._seen))
+
+    # --- scheduling
+
+    def _interval(self, name: str, gw: int | None, live: bool) -> float:
+        if INTERVALS[name] is not None:
+            return INTERVALS[name][0 if live else 1]
+        if not gw:
+            return 3600
+        # refresh just ahead of the adaptive disk TTL so viewers never see it lapse
+        ttl = api.event_live_ttl(gw) if name == "live" else api.event_fixtures_ttl(gw)
+        return max(TICK, ttl - TICK)
+
+    def _due(self, name: str, gw: int | None, live: bool, now: float) -> bool:
+        return now - self._jobs[name].last_run >= self._interval(name, gw, live)
+
+    def tick(self) -> None:
+        now = time.time()
+        status = api.get_game_status() or {}
+        gw = status.get("current_event")
+        live = bool(gw) and fixture_phase(api.get_fixtures(gw) or [], status) == IN_PLAY
+        leagues = self._leagues(now)
+
+        for name in INTERVALS:
+            if not self._due(name, gw, live, now):
+                continue
+            try:
+                self._run_job(name, gw, leagues)
+            except Exception:
+                log.exception("warmer job %s failed", name)
+            self._jobs[name].last_run = time.time()
+
+    def _refresh(self, fn, *args, clears=()) -> bool:
+        """Re-fetch through the uncached function; drop in-memory entries if the body changed."""
+        with refreshing() as changed:
+            try:
+                fn.__wrapped__(*args)
+            except UpstreamError as e:
+                # viewers keep the last good payload; whatever did change is still dropped below
+                log.warning("warmer refresh of %s failed: %s", fn.__name__, e)
+        if changed and self.clear_memory:
+            fn.clear(*args)
+            for dep, dep_args in clears:
+                dep.clear(*dep_args)
+        return bool(changed)
+
+    def _run_job(self, name: str, gw: int | None, leagues: list[int]) -> None:
+        if name == "game":
+            self._refresh(api.get_game_status)
+        elif name == "bootstrap":
+            self._refresh(api.get_bootstrap_store, clears=[(api.get_bootstrap, ())])
+        elif name == "fixtures" and gw:
+            self._refresh(api.get_event_fixtures, gw, clears=[(api.get_fixture_index, ())])
+        elif name == "live" and gw:
+            self._refresh(api.get_event_live, gw, clears=[(api.get_live_stats, (gw,))])
+        elif name == "league":
+            for lid in leagues:
+                self._refresh(api.get_league_details, lid, clears=[(api.league_entries_map, (lid,))])
+        elif name == "ownership":
+            for lid in leagues:
+                self._refresh(api.get_element_status, lid)
+        elif name == "picks" and gw:
+            for lid in leagues:
+                entries = tuple(sorted(api.league_entries_map(lid)))
+                if entries:
+                    self._refresh(api.fetch_entry_events, entries, gw,
+                                  clears=[(api.build_gw_player_table, (lid, gw))])
+        elif name == "warehouse":
+            # history for finished GWs is fetched once; this only tops up new GWs
+            fetched = sum(warehouse.backfill(lid)["live"] for lid in leagues)
+            if fetched and self.clear_memory:
+                warehouse.player_history.clear()
+                warehouse.player_form.clear()
+                warehouse.ownership_history.clear()
+
+    # --- lifecycle
+
+    def run_forever(self) -> None:
+        while not self._stop.is_set():
+            self.tick()
+            self._stop.wait(TICK)
+
+    def start(self) -> "Warmer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, name="fpl-cache-warmer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+@st.cache_resource
+def _app_warmer() -> Warmer:
+    return Warmer().start()
+
+
+def start_warmer(league_id: int) -> Warmer | None:
+    """
+    Start (once per process) the in-app warmer and register `league_id` with
+    it, once the league's details have loaded (a made-up ?league= id must not
+    buy upstream traffic).
+    """
+    if os.environ.get("FPL_WARMER", "1").lower() in ("0", "false", "off"):
+        return None
+    warmer = _app_warmer()
+    if (api.get_league_details(int(league_id)) or {}).get("league_entries"):
+        warmer.add_league(int(league_id))
+    return warmer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Keep the FPL response cache warm.")
+    parser.add_argument("--league", type=int, action="append", required=True,
+                        help="league id to warm (repeatable)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    Warmer(args.league, clear_memory=False).run_forever()
+
+
+if __name__ == "__main__":
+    main()